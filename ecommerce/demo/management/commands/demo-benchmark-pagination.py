@@ -0,0 +1,112 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ecommerce.drf.pagination import KeysetPagination
+from ecommerce.inventory.models import Product, ProductInventory, ProductType
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark limit/offset against keyset pagination of active sub "
+        "products on page 1 and deep pages, data is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=250_000)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--pages", type=int, nargs="+", default=[1, 100, 1_000, 10_000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        page_size = options["page_size"]
+        pages = [
+            page
+            for page in options["pages"]
+            if (page - 1) * page_size < options["rows"]
+        ]
+
+        with transaction.atomic():
+            self.create_inventory(options["rows"])
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {ProductInventory._meta.db_table}")
+
+            queryset = ProductInventory.objects.filter(is_active=True)
+            factory = APIRequestFactory()
+            for page in pages:
+                offset = (page - 1) * page_size
+                request = Request(
+                    factory.get(f"/api/inventory/?limit={page_size}&offset={offset}")
+                )
+                elapsed = self.time(
+                    lambda: LimitOffsetPagination().paginate_queryset(
+                        queryset.order_by("-created_at", "-id"), request
+                    ),
+                    options["repeat"],
+                )
+                self.report("limit/offset", page, elapsed)
+
+                request = Request(
+                    factory.get(
+                        f"/api/inventory/?limit={page_size}"
+                        f"&cursor={self.get_cursor(queryset, offset)}"
+                    )
+                )
+                elapsed = self.time(
+                    lambda: KeysetPagination().paginate_queryset(queryset, request),
+                    options["repeat"],
+                )
+                self.report("keyset", page, elapsed)
+
+            transaction.set_rollback(True)
+
+    def get_cursor(self, queryset, offset):
+        """
+        Cursor of the page starting at offset, as the previous page links to it
+        """
+        if offset == 0:
+            return ""
+        paginator = KeysetPagination()
+        paginator.fields = paginator.get_fields(queryset.model)
+        last = queryset.order_by(*paginator.ordering)[offset - 1 : offset].get()
+        return paginator.encode_cursor(last)
+
+    def time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def report(self, name, page, elapsed):
+        self.stdout.write(f"{name:>12} page {page:>6}: {elapsed * 1000:8.2f}ms")
+
+    def create_inventory(self, rows, batch_size=10_000):
+        product_type = ProductType.objects.create(name="benchmark")
+        product = Product.objects.create(
+            web_id="benchmark", slug="benchmark", name="benchmark"
+        )
+
+        for start in range(0, rows, batch_size):
+            ProductInventory.objects.bulk_create(
+                ProductInventory(
+                    sku=f"bench{i}",
+                    upc=f"bench{i}",
+                    product_type=product_type,
+                    product=product,
+                    is_active=True,
+                    retail_price="99.99",
+                    store_price=Decimal(1000 + i % 5000) / 100,
+                    weight=1,
+                )
+                for i in range(start, min(start + batch_size, rows))
+            )
@@ -0,0 +1,93 @@
+import time
+from decimal import Decimal
+from math import ceil
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ecommerce.inventory.models import Product, ProductInventory, ProductType
+from ecommerce.promotion.models import Promotion, ProductsOnPromotion, PromoType
+from ecommerce.promotion.pricing import reprice_promotion
+
+
+def legacy_promotion_prices(reduction_amount, obj_id):
+    """
+    Row by row implementation promotion_prices used before, kept for comparison
+    """
+    promotions = ProductsOnPromotion.objects.filter(promotion_id=obj_id)
+    reduction = reduction_amount / 100
+
+    for promo in promotions:
+        if promo.price_override == False:
+            store_price = promo.product_inventory_id.store_price
+            new_price = ceil(store_price - (store_price * Decimal(reduction)))
+            promo.promo_price = Decimal(new_price)
+            promo.save()
+
+
+class Command(BaseCommand):
+    help = "Benchmark promotion price recomputation, data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument(
+            "--legacy-max",
+            type=int,
+            default=100_000,
+            help="skip the row by row implementation above this size",
+        )
+
+    def handle(self, *args, **options):
+        for rows in options["rows"]:
+            with transaction.atomic():
+                promotion = self.create_promotion(rows)
+
+                if rows <= options["legacy_max"]:
+                    started = time.perf_counter()
+                    legacy_promotion_prices(10, promotion.id)
+                    self.report("legacy", rows, time.perf_counter() - started)
+
+                started = time.perf_counter()
+                changed = reprice_promotion(promotion.id, 20)
+                self.report("set-based", rows, time.perf_counter() - started)
+                self.stdout.write(f"  rows changed: {changed}")
+
+                transaction.set_rollback(True)
+
+    def report(self, name, rows, elapsed):
+        self.stdout.write(
+            f"{name:>10} {rows:>9} rows: {elapsed:8.2f}s ({rows / elapsed:,.0f} rows/s)"
+        )
+
+    def create_promotion(self, rows, batch_size=10_000):
+        product_type = ProductType.objects.create(name="benchmark")
+        product = Product.objects.create(
+            web_id="benchmark", slug="benchmark", name="benchmark"
+        )
+        promotion = Promotion.objects.create(
+            name="benchmark",
+            promo_type=PromoType.objects.create(name="benchmark"),
+            promo_start="2000-01-01",
+            promo_end="2000-01-01",
+        )
+
+        for start in range(0, rows, batch_size):
+            inventory = ProductInventory.objects.bulk_create(
+                ProductInventory(
+                    sku=f"bench{i}",
+                    upc=f"bench{i}",
+                    product_type=product_type,
+                    product=product,
+                    retail_price="99.99",
+                    store_price=Decimal(1000 + i % 5000) / 100,
+                    weight=1,
+                )
+                for i in range(start, min(start + batch_size, rows))
+            )
+            ProductsOnPromotion.objects.bulk_create(
+                ProductsOnPromotion(product_inventory_id=item, promotion_id=promotion)
+                for item in inventory
+            )
+        return promotion
@@ -0,0 +1,120 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce.drf.fastserializer import ProductInventoryValuesSerializer
+from ecommerce.drf.renderers import FastJSONRenderer
+from ecommerce.drf.serializer import ProductInventorySerializer
+from ecommerce.inventory.models import (
+    Brand,
+    Media,
+    Product,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductInventory,
+    ProductType,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark ProductInventorySerializer with JSONRenderer against "
+        "ProductInventoryValuesSerializer with FastJSONRenderer on pages of "
+        "sub products with brand, media and attributes, data is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000)
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_inventory(options["rows"])
+            queryset = ProductInventory.objects.filter(sku__startswith="bench")
+            page_size = options["page_size"]
+            pages = [
+                queryset.order_by("id")[start : start + page_size]
+                for start in range(0, options["rows"], page_size)
+            ]
+
+            def drf():
+                for page in pages:
+                    page = page.select_related("brand", "product").prefetch_related(
+                        "media", "attribute_values__product_attribute"
+                    )
+                    data = ProductInventorySerializer(page, many=True).data
+                    JSONRenderer().render(data)
+
+            def fast():
+                for page in pages:
+                    rows = ProductInventoryValuesSerializer.values(page)
+                    data = ProductInventoryValuesSerializer(rows).data
+                    FastJSONRenderer().render(data)
+
+            results = {}
+            for name, func in (("drf", drf), ("values", fast)):
+                elapsed = self.time(func, options["repeat"])
+                results[name] = elapsed
+                self.stdout.write(
+                    f"{name:>8}: {elapsed * 1000:8.1f}ms "
+                    f"({options['rows'] / elapsed:,.0f} items/s)"
+                )
+            self.stdout.write(f"speedup: {results['drf'] / results['values']:.1f}x")
+
+            transaction.set_rollback(True)
+
+    def time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def create_inventory(self, rows):
+        product_type = ProductType.objects.create(name="benchmark")
+        product = Product.objects.create(
+            web_id="benchmark", slug="benchmark", name="benchmark"
+        )
+        brand = Brand.objects.create(name="benchmark")
+        attribute = ProductAttribute.objects.create(
+            name="benchmark", description="benchmark"
+        )
+        values = ProductAttributeValue.objects.bulk_create(
+            ProductAttributeValue(product_attribute=attribute, attribute_value=str(i))
+            for i in range(3)
+        )
+
+        inventory = ProductInventory.objects.bulk_create(
+            ProductInventory(
+                sku=f"bench{i}",
+                upc=f"bench{i}",
+                product_type=product_type,
+                product=product,
+                brand=brand,
+                is_active=True,
+                retail_price="99.99",
+                store_price=Decimal(1000 + i % 5000) / 100,
+                weight=1,
+            )
+            for i in range(rows)
+        )
+        Media.objects.bulk_create(
+            Media(
+                product_inventory=item,
+                img_url=f"images/bench{item.id}.png",
+                alt_text="benchmark",
+            )
+            for item in inventory
+        )
+        through = ProductInventory.attribute_values.through
+        through.objects.bulk_create(
+            through(productinventory=item, attributevalues=value)
+            for item in inventory
+            for value in values
+        )
@@ -18,3 +18,6 @@ class Command(BaseCommand):
         call_command("loaddata", "db_product_attribute_value_fixture_50.json")
         call_command("loaddata", "db_product_attribute_values_fixture_50.json")
         call_command("loaddata", "db_product_type_attribute_fixture_50.json")
+        call_command("promotion-rebuild-timeline")
+        # fixtures are loaded raw, the search index is built from scratch
+        call_command("search-reindex")
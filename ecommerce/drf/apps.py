@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DrfConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ecommerce.drf"
+
+    def ready(self):
+        from . import signals  # noqa: F401
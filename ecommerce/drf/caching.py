@@ -0,0 +1,104 @@
+import time
+from functools import partial, wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = "drf:version:{}"
+RESPONSE_KEY = "drf:response:{}"
+
+# collection tags, bumped by any write to the model
+CATEGORIES = "categories"
+PRODUCTS = "products"
+INVENTORIES = "inventories"
+
+
+def get_version(name):
+    """
+    Current version of a cached resource, cached responses embed it in
+    their keys. Starts from the clock so an evicted counter never reuses
+    old versions
+    """
+    return cache.get_or_set(VERSION_KEY.format(name), time.time_ns() // 1000, None)
+
+
+def bump_version(name):
+    """
+    Invalidate every cached response of the resource at once. The new version
+    is the time of the bump in microseconds unless the counter is ahead of
+    the clock, so versions double as last modified timestamps
+    """
+    version = max(get_version(name) + 1, time.time_ns() // 1000)
+    cache.set(VERSION_KEY.format(name), version, None)
+    return version
+
+
+def get_versions(names):
+    """
+    {name: version} of several resources in one round trip
+    """
+    keys = {VERSION_KEY.format(name): name for name in names}
+    versions = {keys[key]: value for key, value in cache.get_many(keys).items()}
+    for name in set(names) - versions.keys():
+        versions[name] = get_version(name)
+    return versions
+
+
+def bump_versions(names):
+    """
+    bump_version of several resources in two round trips
+    """
+    keys = [VERSION_KEY.format(name) for name in set(names)]
+    if not keys:
+        return
+    now = time.time_ns() // 1000
+    versions = cache.get_many(keys)
+    cache.set_many({key: max(versions.get(key, now) + 1, now) for key in keys}, None)
+
+
+def bump_versions_on_commit(names):
+    """
+    bump_versions once the current transaction commits, a response built
+    before then reads the old rows and must not be stored under the new
+    versions
+    """
+    transaction.on_commit(partial(bump_versions, list(names)))
+
+
+def tagged_cache(get_tags):
+    """
+    Cache the response data of an APIView.get under its URL, tagged with the
+    resources view.<get_tags>(**kwargs) returns. Tag versions are read before
+    the view runs, or taken from view.tag_versions when the conditional GET
+    validators already read them, and the entry stores them: it is a miss
+    once any of them was bumped, including by a write committed while the
+    view ran
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            versions = getattr(view, "tag_versions", None)
+            if versions is None:
+                versions = get_versions(getattr(view, get_tags)(**kwargs))
+            url = request.build_absolute_uri()
+            key = RESPONSE_KEY.format(md5(url.encode()).hexdigest())
+            entry = cache.get(key)
+            if entry is not None:
+                data, entry_versions = entry
+                if entry_versions == versions:
+                    return Response(data)
+
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key, (response.data, versions), settings.RESPONSE_CACHE_TIMEOUT
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,60 @@
+from functools import wraps
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .caching import get_versions
+
+
+def get_etag(*parts):
+    return quote_etag(md5(repr(parts).encode()).hexdigest())
+
+
+def get_tag_validators(request, tags):
+    """
+    Validators of a response that only changes when one of tags is bumped,
+    tag versions are bump timestamps
+    """
+    versions = get_versions(tags)
+    etag = get_etag(request.get_full_path(), sorted(versions.items()))
+    return etag, get_last_modified(versions.values())
+
+
+def get_last_modified(versions, *datetimes):
+    """
+    Latest of the tag versions (microsecond timestamps) and datetimes,
+    in seconds
+    """
+    return max(
+        [version // 1_000_000 for version in versions]
+        + [int(value.timestamp()) for value in datetimes if value is not None]
+    )
+
+
+def conditional(get_validators):
+    """
+    Answer If-None-Match / If-Modified-Since of an APIView.get with 304 from
+    view.<get_validators>(request, **kwargs) -> (etag, last_modified timestamp) before
+    the view runs, add ETag and Last-Modified to full responses
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = getattr(view, get_validators)(request, **kwargs)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.headers["ETag"] = etag
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
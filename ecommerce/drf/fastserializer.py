@@ -0,0 +1,208 @@
+from functools import lru_cache
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from ecommerce.drf.serializer import (
+    CategorySerializer,
+    ProductInventorySerializer,
+    ProductSerializer,
+)
+from ecommerce.inventory.models import Media
+from ecommerce.promotion.pricing import get_promotion_prices
+
+# fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for serializer_class: the representation is built
+    from queryset.values() rows by extractors compiled once per class from
+    the fields of serializer_class, no model or serializer instance per row.
+    Forward relations are read from joined columns, many relations from one
+    query per page. SerializerMethodFields need an entry in method_fields,
+    (column, function of its value), or page_fields, a function of the
+    page's primary keys returning {pk: value}. Many relations are listed in
+    primary key order
+    """
+
+    serializer_class = None
+    method_fields = {}
+    page_fields = {}
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def values(cls, queryset, *extra):
+        """
+        Rows of queryset to serialize, with the extra columns a paginator needs
+        """
+        paths = _get_plan(cls).paths
+        return queryset.values(*paths, *(path for path in extra if path not in paths))
+
+    @property
+    def data(self):
+        plan = _get_plan(self.__class__)
+        rows = list(self.rows)
+        pks = [row[plan.pk] for row in rows]
+
+        related = {}
+        for label, query_name, model, child in plan.many:
+            groups = {pk: [] for pk in pks}
+            if pks:
+                queryset = (
+                    model._default_manager.filter(**{f"{query_name}__in": pks})
+                    .values(query_name, *child.paths)
+                    .order_by(model._meta.pk.name)
+                )
+                for row in queryset:
+                    groups[row[query_name]].append(child.build(row, None))
+            related[label] = groups
+        for label, func in plan.page:
+            related[label] = func(pks) if pks else {}
+
+        return [plan.build(row, related) for row in rows]
+
+
+class Plan:
+    def __init__(self, model):
+        self.pk = model._meta.pk.attname
+        self.paths = [self.pk]
+        self.many = []
+        self.page = []
+        self.build = None
+
+
+@lru_cache(maxsize=None)
+def _get_plan(values_serializer_class):
+    serializer_class = values_serializer_class.serializer_class
+    model = serializer_class.Meta.model
+    plan = Plan(model)
+    plan.build = _compile(values_serializer_class, serializer_class(), model, plan)
+    return plan
+
+
+def _compile(cls, serializer, model, plan, prefix="", label=""):
+    """
+    Add the columns of serializer to plan.paths, return the function
+    building its representation from a row and the related values of the page
+    """
+    names, getters = [], []
+
+    for name, field in serializer.fields.items():
+        field_label = label + name
+        source = prefix + field.source
+
+        if isinstance(field, serializers.SerializerMethodField):
+            if field_label in cls.method_fields:
+                path, func = cls.method_fields[field_label]
+                getter = _column(plan, prefix + path, func)
+            elif field_label in cls.page_fields and not label:
+                plan.page.append((field_label, cls.page_fields[field_label]))
+                getter = _page_value(field_label, plan.pk)
+            else:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} has no extractor for {field_label}"
+                )
+
+        elif isinstance(field, serializers.ListSerializer):
+            if label:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__}: many relation {field_label} must be top level"
+                )
+            relation = model._meta.get_field(field.source)
+            if relation.auto_created:
+                query_name = relation.field.name
+            else:
+                query_name = relation.related_query_name()
+            child = Plan(relation.related_model)
+            child.build = _compile(
+                cls, field.child, relation.related_model, child, label=field_label + "."
+            )
+            plan.many.append((field_label, query_name, relation.related_model, child))
+            getter = _many_value(field_label, plan.pk)
+
+        elif isinstance(field, serializers.BaseSerializer):
+            relation = model._meta.get_field(field.source)
+            nested = _compile(
+                cls,
+                field,
+                relation.related_model,
+                plan,
+                prefix=source + "__",
+                label=field_label + ".",
+            )
+            if relation.null:
+                getter = _column(plan, source, None)
+                getter = _nullable(getter, nested)
+            else:
+                getter = nested
+
+        else:
+            if isinstance(field, PASSTHROUGH_FIELDS):
+                func = None
+            else:
+                func = field.to_representation
+            getter = _column(plan, source, func)
+
+        names.append(name)
+        getters.append(getter)
+
+    def build(row, related):
+        return dict(zip(names, [getter(row, related) for getter in getters]))
+
+    return build
+
+
+def _column(plan, path, func):
+    if path not in plan.paths:
+        plan.paths.append(path)
+    get = itemgetter(path)
+    if func is None:
+        return lambda row, related: get(row)
+
+    def getter(row, related):
+        value = get(row)
+        return None if value is None else func(value)
+
+    return getter
+
+
+def _nullable(get, nested):
+    def getter(row, related):
+        return None if get(row, related) is None else nested(row, related)
+
+    return getter
+
+
+def _many_value(label, pk):
+    return lambda row, related: related[label][row[pk]]
+
+
+def _page_value(label, pk):
+    return lambda row, related: related[label].get(row[pk])
+
+
+class CategoryValuesSerializer(ValuesSerializer):
+    serializer_class = CategorySerializer
+
+
+class ProductValuesSerializer(ValuesSerializer):
+    serializer_class = ProductSerializer
+
+
+class ProductInventoryValuesSerializer(ValuesSerializer):
+    serializer_class = ProductInventorySerializer
+    method_fields = {
+        "media.img_url": ("img_url", Media._meta.get_field("img_url").storage.url),
+    }
+    page_fields = {"promotion_price": get_promotion_prices}
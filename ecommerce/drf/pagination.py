@@ -0,0 +1,143 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Field, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Cursor over the primary key, every page is an index range scan
+    whatever its depth, no count query
+    """
+
+    ordering = "id"
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class Row(Func):
+    """
+    SQL row constructor, ROW(a, b) > ROW(x, y) is a single index range condition
+    """
+
+    function = "ROW"
+    output_field = Field()
+
+
+def get_approximate_count(queryset):
+    """
+    Row count estimated by the planner: pg_class.reltuples for a whole table,
+    the EXPLAIN row estimate for a filtered queryset
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 until the table is analyzed
+        if row and row[0] >= 0:
+            return row[0]
+    plan = json.loads(queryset.explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on ordering, whose last field must be unique. The cursor
+    holds the ordering values of the last row of the page, the next page starts
+    with ROW(ordering) > ROW(cursor) so page 10,000 costs the same as page 1
+    given an index on the ordering fields. Pages model instances or values()
+    rows including the ordering fields.
+    ?count=approximate adds the planner's estimate of the total
+    """
+
+    ordering = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "approximate":
+            self.count = get_approximate_count(queryset)
+
+        fields = self.get_field_names()
+        self.fields = self.get_fields(queryset.model)
+        descending = self.ordering[0].startswith("-")
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            position = Row(*(F(name) for name in fields))
+            after = Row(*(Value(value) for value in cursor))
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.alias(keyset_position=position).filter(
+                **{f"keyset_position__{lookup}": after}
+            )
+
+        page = list(queryset.order_by(*self.ordering)[: self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[: self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_field_names(self):
+        return [name.lstrip("-") for name in self.ordering]
+
+    def get_fields(self, model):
+        return [model._meta.get_field(name) for name in self.get_field_names()]
+
+    def get_paginated_response(self, data):
+        content = {"next": self.get_next_link(), "results": data}
+        if self.count is not None:
+            content = {"count": self.count, **content}
+        return Response(content)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.last)
+        )
+
+    def encode_cursor(self, obj):
+        if isinstance(obj, dict):
+            # values() row
+            obj = SimpleNamespace(**obj)
+        values = [field.value_to_string(obj) for field in self.fields]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound("Invalid cursor")
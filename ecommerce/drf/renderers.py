@@ -0,0 +1,76 @@
+import math
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson writes the floats json.dumps puts in exponent notation, from 1e16 on
+# and below 1e-4, as 1e16, 1e-7 or 0.00009 for 1e+16, 1e-07 or 9e-05. The
+# patterns start with a literal, which re scans for quickly
+EXPONENT = re.compile(rb"e[-0-9]")
+SMALL_FLOAT = re.compile(rb"0\.0000\d")
+
+
+def has_exponent_float(content):
+    """
+    Whether orjson output may hold a float json.dumps writes differently,
+    false positives from strings only cost a fallback
+    """
+    for match in EXPONENT.finditer(content):
+        if content[match.start() - 1 : match.start()].isdigit():
+            return True
+    for match in SMALL_FLOAT.finditer(content):
+        if not content[match.start() - 1 : match.start()].isdigit():
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed. The output is
+    the same bytes as JSONRenderer for the compact, unicode settings: types
+    orjson does not handle natively go through the DRF encoder, and output
+    with a float json.dumps writes in exponent notation, anything orjson rejects, indented output or other settings
+    fall back to JSONRenderer. Float NaN and infinities are written as null,
+    orjson does not call back for them
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder_default = self.encoder_class().default
+
+        def default(obj):
+            # e.g. Decimal, encoded as float, JSONRenderer rejects NaN
+            value = encoder_default(obj)
+            if isinstance(value, float) and not math.isfinite(value):
+                raise TypeError
+            return value
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if has_exponent_float(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # escaped like JSONRenderer does, to stay a strict javascript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
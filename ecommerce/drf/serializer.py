@@ -1,5 +1,4 @@
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.db import models
 from rest_framework import serializers
 
 from ecommerce.inventory.models import (
@@ -10,7 +9,7 @@ from ecommerce.inventory.models import (
     Media,
     Category,
 )
-from ecommerce.promotion.models import Promotion
+from ecommerce.promotion.pricing import get_promotion_prices
 
 
 class MediaSerializer(serializers.ModelSerializer):
@@ -56,6 +55,20 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only = True
 
 
+class CategoryTreeSerializer(CategorySerializer):
+    """
+    Category with its nested children, expects nodes from get_cached_trees()
+    """
+
+    children = serializers.SerializerMethodField()
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ["children"]
+
+    def get_children(self, obj):
+        return CategoryTreeSerializer(obj.get_children(), many=True).data
+
+
 class ProductSerializer(serializers.ModelSerializer):
     # category = CategorySerializer()
 
@@ -66,7 +79,36 @@ class ProductSerializer(serializers.ModelSerializer):
         editable = False
 
 
-class ProductInventorySerializer(serializers.ModelSerializer):
+class PromotionPriceListSerializer(serializers.ListSerializer):
+    """
+    Resolve promotion prices for the whole page in one query
+    and expose them to the child serializer through context
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        data = list(data)
+        if "promotion_prices" not in self.context:
+            self.context["promotion_prices"] = get_promotion_prices(
+                item.id for item in data
+            )
+        return super().to_representation(data)
+
+
+class PromotionPriceMixin:
+    """
+    Read the promotion price from context["promotion_prices"]
+    """
+
+    def get_promotion_price(self, obj):
+        prices = self.context.get("promotion_prices")
+        if prices is None:
+            prices = get_promotion_prices([obj.id])
+        return prices.get(obj.id)
+
+
+class ProductInventorySerializer(PromotionPriceMixin, serializers.ModelSerializer):
 
     brand = BrandSerializer(many=False, read_only=True)
     attributes = ProductAttributeValueSerializer(
@@ -92,29 +134,4 @@ class ProductInventorySerializer(serializers.ModelSerializer):
             "promotion_price",
         ]
         read_only = True
-
-    def get_promotion_price(self, obj):
-        try:
-            x = Promotion.products_on_promotion.through.objects.get(
-                Q(promotion_id__is_active=True) & Q(product_inventory_id=obj.id)
-            )
-            return x.promo_price
-        except ObjectDoesNotExist:
-            return None
-
-
-class ProductInventorySearchSerializer(serializers.ModelSerializer):
-
-    product = ProductSerializer(many=False, read_only=True)
-    brand = BrandSerializer(many=False, read_only=True)
-
-    class Meta:
-        model = ProductInventory
-        fields = [
-            "id",
-            "sku",
-            "store_price",
-            "is_default",
-            "product",
-            "brand",
-        ]
+        list_serializer_class = PromotionPriceListSerializer
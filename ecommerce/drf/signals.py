@@ -0,0 +1,116 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from ecommerce.inventory.models import (
+    Category,
+    Media,
+    Product,
+    ProductInventory,
+    Stock,
+)
+from ecommerce.promotion.models import ProductsOnPromotion
+from ecommerce.promotion.signals import (
+    promotion_prices_changed,
+    promotion_status_changed,
+)
+
+from .caching import CATEGORIES, INVENTORIES, PRODUCTS, bump_versions_on_commit
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_versions_on_commit([CATEGORIES])
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_category(sender, instance, raw=False, **kwargs):
+    # a product moved to another category leaves the listings of the old one
+    instance._previous_category_id = (
+        Product.objects.filter(pk=instance.pk)
+        .values_list("category_id", flat=True)
+        .first()
+        if instance.pk and not raw
+        else None
+    )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    category_ids = {
+        instance.category_id,
+        getattr(instance, "_previous_category_id", None),
+    } - {None}
+    category_slugs = (
+        Category.objects.filter(id__in=category_ids)
+        .get_ancestors(include_self=True)
+        .values_list("slug", flat=True)
+        if category_ids
+        else []
+    )
+    bump_versions_on_commit(
+        [PRODUCTS, INVENTORIES, f"product:{instance.web_id}"]
+        + [f"category:{slug}" for slug in category_slugs]
+    )
+
+
+@receiver(post_save, sender=ProductInventory)
+@receiver(post_delete, sender=ProductInventory)
+def invalidate_inventory(sender, instance, **kwargs):
+    web_id = (
+        Product.objects.filter(pk=instance.product_id)
+        .values_list("web_id", flat=True)
+        .first()
+    )
+    bump_versions_on_commit(
+        [INVENTORIES, f"inventory:{instance.id}", f"product:{web_id}"]
+    )
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def invalidate_inventory_details(sender, instance, **kwargs):
+    tags = [f"inventory:{instance.product_inventory_id}"]
+    if sender is Media:
+        # stock is not part of the sub product listing
+        tags.append(INVENTORIES)
+    bump_versions_on_commit(tags)
+
+
+@receiver(m2m_changed, sender=ProductInventory.attribute_values.through)
+def invalidate_inventory_attributes(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, ProductInventory):
+        ids = [instance.id]
+    else:
+        ids = pk_set or []
+    bump_versions_on_commit([INVENTORIES] + [f"inventory:{id}" for id in ids])
+
+
+@receiver(post_save, sender=ProductsOnPromotion)
+@receiver(post_delete, sender=ProductsOnPromotion)
+def invalidate_inventory_promotion(sender, instance, **kwargs):
+    bump_versions_on_commit(
+        [
+            INVENTORIES,
+            f"inventory:{instance.product_inventory_id_id}",
+            f"promotion:{instance.promotion_id_id}",
+        ]
+    )
+
+
+@receiver(promotion_prices_changed)
+def invalidate_repriced_promotion(sender, promotion_id, **kwargs):
+    bump_versions_on_commit([INVENTORIES, f"promotion:{promotion_id}"])
+
+
+@receiver(promotion_status_changed)
+def invalidate_started_and_ended_promotions(sender, activated, deactivated, **kwargs):
+    if activated or deactivated:
+        bump_versions_on_commit(
+            [INVENTORIES] + [f"promotion:{id}" for id in activated + deactivated]
+        )
@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from ecommerce.drf.caching import CATEGORIES, bump_versions, get_version
+from ecommerce.drf.fastserializer import CategoryValuesSerializer
+from ecommerce.inventory.models import Category, Product, Stock
+from ecommerce.promotion.models import ProductsOnPromotion
+
+
+def test_inventory_response_cached_until_tag_bumped(
+    settings,
+    api_client,
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+    promotion_multi_variant,
+):
+    settings.RESPONSE_CACHE_TIMEOUT = 300
+    inventory = ProductsOnPromotion.objects.get().product_inventory_id
+    endpoint = f"/api/inventory/{inventory.product.web_id}/"
+
+    api_client().get(endpoint)
+    # only the conditional GET validators
+    with django_assert_num_queries(1):
+        cached = api_client().get(endpoint)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Stock.objects.create(product_inventory=inventory, units=1)
+    with django_assert_num_queries(5):
+        api_client().get(endpoint)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product_on_promotion = ProductsOnPromotion.objects.get()
+        product_on_promotion.promo_price = "80.00"
+        product_on_promotion.save()
+    response = api_client().get(endpoint)
+
+    assert cached.data[0]["promotion_price"] == Decimal("100.00")
+    assert response.data[0]["promotion_price"] == Decimal("80.00")
+
+
+def test_category_products_invalidated_by_product_write(
+    settings, api_client, django_capture_on_commit_callbacks, single_product
+):
+    settings.RESPONSE_CACHE_TIMEOUT = 300
+    parent = single_product.category.parent
+    endpoint = f"/api/inventory/products/category/{parent.slug}/"
+
+    first = api_client().get(endpoint)
+    with django_capture_on_commit_callbacks(execute=True):
+        Product.objects.create(
+            web_id="new", slug="new", name="new", category=parent, is_active=True
+        )
+    second = api_client().get(endpoint)
+
+    assert len(first.data["results"]) == 1
+    assert len(second.data["results"]) == 2
+
+
+def test_tags_bumped_on_commit(django_capture_on_commit_callbacks, single_category):
+    version = get_version(CATEGORIES)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        single_category.name = "renamed"
+        single_category.save()
+        assert get_version(CATEGORIES) == version
+
+    callbacks[0]()
+    assert get_version(CATEGORIES) > version
+
+
+def test_response_built_during_a_write_not_cached_as_current(
+    settings, monkeypatch, api_client, single_category
+):
+    settings.RESPONSE_CACHE_TIMEOUT = 300
+    endpoint = "/api/inventory/category/all"
+    data = CategoryValuesSerializer.data
+
+    def data_then_write(self):
+        rows = data.fget(self)
+        # a category committed after the rows were read
+        Category.objects.create(name="new", slug="new")
+        bump_versions([CATEGORIES])
+        return rows
+
+    monkeypatch.setattr(CategoryValuesSerializer, "data", property(data_then_write))
+    first = api_client().get(endpoint)
+    monkeypatch.undo()
+    second = api_client().get(endpoint)
+
+    assert "new" not in [category["slug"] for category in first.data]
+    assert "new" in [category["slug"] for category in second.data]
@@ -1,5 +1,84 @@
+import json
+
+from ecommerce.drf.caching import CATEGORIES, bump_version
+
+
 def test_get_all_categories(api_client, category_with_multiple_children):
     endpoint = "/api/inventory/category/all"
     response = api_client().get(endpoint)
     assert response.status_code == 200
     assert len(response.data) == len(category_with_multiple_children)
+
+
+def test_get_category_tree(api_client, category_with_multiple_children):
+    bump_version(CATEGORIES)
+    endpoint = "/api/inventory/category/tree/"
+
+    response = api_client().get(endpoint)
+    not_modified = api_client().get(endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response.status_code == 200
+    tree = json.loads(response.content)
+    assert [node["slug"] for node in tree] == ["parent"]
+    assert tree[0]["children"][0]["children"][0]["slug"] == "grandchild"
+    assert not_modified.status_code == 304
+
+
+def test_get_category_subtree(
+    api_client, django_assert_num_queries, category_with_multiple_children
+):
+    bump_version(CATEGORIES)
+
+    with django_assert_num_queries(2):
+        response = api_client().get("/api/inventory/category/tree/child/")
+    with django_assert_num_queries(0):
+        api_client().get("/api/inventory/category/tree/child/")
+
+    assert json.loads(response.content) == [
+        {
+            "name": "child",
+            "slug": "child",
+            "is_active": False,
+            "children": [
+                {
+                    "name": "grandchild",
+                    "slug": "grandchild",
+                    "is_active": False,
+                    "children": [],
+                }
+            ],
+        }
+    ]
+
+
+def test_category_tree_invalidated_on_write(
+    api_client, django_capture_on_commit_callbacks, category_with_child
+):
+    endpoint = "/api/inventory/category/tree/"
+    etag = api_client().get(endpoint)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category_with_child.name = "renamed"
+        category_with_child.save()
+    response = api_client().get(endpoint, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert json.loads(response.content)[0]["children"][0]["name"] == "renamed"
+
+
+def test_category_tree_conditional_headers(api_client, category_with_child):
+    endpoint = "/api/inventory/category/tree/"
+    response = api_client().get(endpoint)
+
+    any_etag = api_client().get(endpoint, HTTP_IF_NONE_MATCH="*")
+    weak_etag = api_client().get(endpoint, HTTP_IF_NONE_MATCH=f"W/{response['ETag']}")
+    not_modified_since = api_client().get(
+        endpoint, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    other_etag = api_client().get(endpoint, HTTP_IF_NONE_MATCH='"other"')
+
+    assert any_etag.status_code == 304
+    assert weak_etag.status_code == 304
+    assert not_modified_since.status_code == 304
+    assert not_modified_since["ETag"] == response["ETag"]
+    assert other_etag.status_code == 200
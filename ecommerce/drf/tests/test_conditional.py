@@ -0,0 +1,75 @@
+import time
+
+from django.utils.http import http_date
+
+from ecommerce.inventory.models import Media, Stock
+
+
+def test_inventory_not_modified(
+    api_client, django_assert_num_queries, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    endpoint = f"/api/inventory/{inventory.product.web_id}/"
+
+    response = api_client().get(endpoint)
+    with django_assert_num_queries(1):
+        not_modified = api_client().get(endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+    since = api_client().get(
+        endpoint, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+    )
+
+    assert response.status_code == 200
+    assert response.has_header("Last-Modified")
+    assert not_modified.status_code == 304
+    assert since.status_code == 304
+
+
+def test_inventory_modified_by_stock_change(
+    api_client,
+    django_capture_on_commit_callbacks,
+    single_sub_product_with_media_and_attributes,
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    endpoint = f"/api/inventory/{inventory.product.web_id}/"
+    etag = api_client().get(endpoint)["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Stock.objects.create(product_inventory=inventory, units=1)
+    response = api_client().get(endpoint, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_product_list_not_modified(api_client, single_product):
+    endpoint = "/api/inventory/products/?limit=5"
+    etag = api_client().get(endpoint)["ETag"]
+
+    response = api_client().get(endpoint, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+def test_inventory_list_not_modified(
+    api_client,
+    django_capture_on_commit_callbacks,
+    single_sub_product_with_media_and_attributes,
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    endpoint = "/api/inventory/?limit=5"
+    response = api_client().get(endpoint)
+
+    not_modified = api_client().get(endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+    other_page = api_client().get(
+        "/api/inventory/?limit=10", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Media.objects.create(
+            product_inventory=inventory, img_url="images/new.png", alt_text="new"
+        )
+    modified = api_client().get(endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response.has_header("Last-Modified")
+    assert not_modified.status_code == 304
+    assert other_page.status_code == 200
+    assert modified.status_code == 200
@@ -0,0 +1,76 @@
+import csv
+import gzip
+import io
+import json
+from decimal import Decimal
+
+from django.core.management import call_command
+
+from ecommerce.inventory.export import EXPORT_FIELDS, export_rows
+from ecommerce.inventory.models import ProductInventory, Stock
+
+
+def test_export_rows(promotion_multi_variant):
+    inventory = ProductInventory.objects.get()
+    Stock.objects.create(product_inventory=inventory, units=3)
+
+    rows = list(export_rows(chunk_size=1))
+
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert rows[0]["sku"] == inventory.sku
+    assert rows[0]["web_id"] == inventory.product.web_id
+    assert rows[0]["brand"] == "default"
+    assert rows[0]["category"] == "child"
+    assert rows[0]["units"] == 3
+    assert rows[0]["store_price"] == Decimal("99.99")
+    assert rows[0]["effective_price"] == Decimal("100.00")
+    assert rows[0]["attributes"] == ["default:default"]
+
+
+def test_export_effective_price_without_promotion(
+    django_assert_num_queries, single_sub_product_with_media_and_attributes
+):
+    # rows, promotion prices, attributes
+    with django_assert_num_queries(3):
+        rows = list(export_rows())
+
+    assert rows[0]["promotion_price"] is None
+    assert rows[0]["effective_price"] == Decimal("99.99")
+
+
+def test_export_endpoint_requires_authentication(api_client):
+    response = api_client().get("/api/inventory/export/ndjson/")
+
+    assert response.status_code == 403
+
+
+def test_export_endpoint_streams_csv(
+    api_client, create_admin_user, single_sub_product_with_media_and_attributes
+):
+    client = api_client()
+    client.force_authenticate(create_admin_user)
+
+    response = client.get("/api/inventory/export/csv/")
+    content = b"".join(response.streaming_content).decode()
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert len(rows) == 1
+    assert rows[0]["sku"] == "123456789"
+    assert rows[0]["effective_price"] == "99.99"
+    assert rows[0]["units"] == ""
+    assert client.get("/api/inventory/export/xml/").status_code == 404
+
+
+def test_catalog_export_command_gzip(
+    tmp_path, single_sub_product_with_media_and_attributes
+):
+    output = tmp_path / "catalog.ndjson.gz"
+
+    call_command("catalog-export", str(output), stderr=io.StringIO())
+
+    with gzip.open(output, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["sku"] for row in rows] == ["123456789"]
+    assert rows[0]["store_price"] == "99.99"
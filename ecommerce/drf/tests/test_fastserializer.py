@@ -0,0 +1,99 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from ecommerce.drf.fastserializer import (
+    CategoryValuesSerializer,
+    ProductInventoryValuesSerializer,
+    ProductValuesSerializer,
+)
+from ecommerce.drf.renderers import FastJSONRenderer
+from ecommerce.drf.serializer import (
+    CategorySerializer,
+    ProductInventorySerializer,
+    ProductSerializer,
+)
+from ecommerce.inventory.models import Category, Product, ProductInventory
+
+
+def render_both(values_serializer_class, serializer_class, queryset):
+    rows = values_serializer_class.values(queryset)
+    fast = FastJSONRenderer().render(values_serializer_class(rows).data)
+    slow = JSONRenderer().render(serializer_class(queryset, many=True).data)
+    return fast, slow
+
+
+def test_values_serializers_render_identical_bytes(promotion_multi_variant):
+    inventory = ProductInventory.objects.get()
+    # second sub product without brand, media or attributes
+    ProductInventory.objects.create(
+        sku="987654321",
+        upc="100000000002",
+        product_type=inventory.product_type,
+        product=inventory.product,
+        retail_price="19.99",
+        store_price="12.50",
+        weight=0.5,
+    )
+
+    for values_serializer_class, serializer_class, queryset in (
+        (CategoryValuesSerializer, CategorySerializer, Category.objects.all()),
+        (ProductValuesSerializer, ProductSerializer, Product.objects.all()),
+        (
+            ProductInventoryValuesSerializer,
+            ProductInventorySerializer,
+            ProductInventory.objects.order_by("id"),
+        ),
+    ):
+        fast, slow = render_both(values_serializer_class, serializer_class, queryset)
+        assert fast == slow
+
+    data = ProductInventoryValuesSerializer(
+        ProductInventoryValuesSerializer.values(ProductInventory.objects.order_by("id"))
+    ).data
+    assert data[0]["promotion_price"] == Decimal("100.00")
+    assert data[1]["brand"] is None
+    assert data[1]["media"] == data[1]["attributes"] == []
+
+
+def test_values_serializer_query_count(
+    django_assert_num_queries, single_sub_product_with_media_and_attributes
+):
+    rows = ProductInventoryValuesSerializer.values(ProductInventory.objects.all())
+
+    # rows, media, attributes, promotion prices
+    with django_assert_num_queries(4):
+        ProductInventoryValuesSerializer(rows).data
+
+
+def test_fast_renderer_matches_json_renderer():
+    data = {
+        "name": "caf\u00e9\u2028\u2029",
+        "price": Decimal("9.90"),
+        "at": datetime(2024, 1, 2, 3, 4, 5, 678901),
+        "items": [1, 2.5, None, True],
+    }
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render(
+        data, "application/json; indent=4"
+    ) == JSONRenderer().render(data, "application/json; indent=4")
+
+
+@pytest.mark.parametrize(
+    "value", [1e16, -1e22, 1e-7, 0.00009999, Decimal("1E+16"), Decimal("1E-7")]
+)
+def test_fast_renderer_matches_json_renderer_exponent_floats(value):
+    data = {"items": [{"value": value}, 0.0, 1e15]}
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("value", [Decimal("NaN"), Decimal("Infinity")])
+def test_fast_renderer_rejects_non_finite_decimals(value):
+    with pytest.raises(ValueError):
+        JSONRenderer().render({"value": value})
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render({"value": value})
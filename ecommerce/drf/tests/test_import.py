@@ -0,0 +1,210 @@
+import gzip
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from ecommerce.drf.caching import get_version
+from ecommerce.inventory.importing import (
+    CategoryImporter,
+    ProductImporter,
+    ProductInventoryImporter,
+    read_rows,
+)
+from ecommerce.inventory.models import (
+    Category,
+    Media,
+    ProductAttributeValues,
+    ProductInventory,
+    Stock,
+)
+
+
+def write_csv(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_import_catalog_dir(db, tmp_path):
+    files = {
+        "categories": [
+            "slug,name,parent,is_active",
+            "shoes,shoes,fashion,True",
+            "fashion,fashion,,True",
+        ],
+        "products": [
+            "web_id,slug,name,description,category,is_active",
+            '45425810,sneakers,sneakers,"running, sneakers",shoes,True',
+        ],
+        "inventory": [
+            "sku,upc,web_id,product_type,brand,is_active,is_default,"
+            "retail_price,store_price,is_digital,weight",
+            "7633969397,100000000001,45425810,shoes,361,True,True,97,92,False,987",
+        ],
+        "media": [
+            "sku,img_url,alt_text,is_feature",
+            "7633969397,images/default.png,a default image,True",
+        ],
+        "stock": ["sku,units,units_sold", "7633969397,135,0"],
+        "attributes": ["sku,attribute,value", "7633969397,woman-shoe-size,5"],
+        "type_attributes": ["product_type,attribute", "shoes,woman-shoe-size"],
+    }
+    for kind, lines in files.items():
+        write_csv(tmp_path / f"{kind}.csv", lines)
+
+    call_command("catalog-import", dir=str(tmp_path), stdout=io.StringIO())
+
+    root = Category.objects.get(slug="fashion")
+    assert root.is_root_node()
+    assert Category.objects.get(slug="shoes").parent == root
+    inventory = ProductInventory.objects.select_related("product", "brand").get(
+        sku="7633969397"
+    )
+    assert inventory.product.web_id == "45425810"
+    assert inventory.product.description == "running, sneakers"
+    assert inventory.brand.name == "361"
+    assert inventory.store_price == Decimal("92")
+    assert Media.objects.count() == Stock.objects.count() == 1
+    assert ProductAttributeValues.objects.count() == 1
+
+
+def test_import_keeps_existing_category_parents(db, tmp_path):
+    CategoryImporter().run(
+        read_rows(
+            write_csv(
+                tmp_path / "categories.csv",
+                ["slug,name,parent", "boots,boots,footwear", "footwear,footwear,"],
+            )
+        )
+    )
+    footwear = Category.objects.get(slug="footwear")
+
+    # no parent column
+    CategoryImporter().run(
+        read_rows(write_csv(tmp_path / "names.csv", ["slug,name", "boots,Boots"]))
+    )
+    boots = Category.objects.get(slug="boots")
+    assert (boots.name, boots.parent) == ("Boots", footwear)
+
+    # an invalid row
+    path = write_csv(tmp_path / "invalid.csv", ["slug,name,parent", "footwear,,boots"])
+    importer = CategoryImporter().run(read_rows(path))
+    assert [line for line, _ in importer.errors] == [2]
+    footwear.refresh_from_db()
+    assert footwear.is_root_node()
+
+    # existing rows are ignored
+    path = write_csv(tmp_path / "ignored.csv", ["slug,name,parent", "boots,boots,"])
+    CategoryImporter(on_conflict="ignore").run(read_rows(path))
+    boots.refresh_from_db()
+    assert (boots.name, boots.parent) == ("Boots", footwear)
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_import_updates_existing_rows(
+    tmp_path, use_copy, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    path = write_csv(
+        tmp_path / "inventory.csv",
+        [
+            "sku,upc,web_id,product_type,brand,retail_price,store_price,weight",
+            f"{inventory.sku},{inventory.upc},{inventory.product.web_id},"
+            "default,other,199.99,89.99,1000",
+            f"new-sku,200000000001,{inventory.product.web_id},default,,9.99,8.99,1",
+        ],
+    )
+    version = get_version(f"product:{inventory.product.web_id}")
+
+    importer = ProductInventoryImporter(use_copy=use_copy).run(read_rows(path))
+
+    assert importer.errors == []
+    inventory.refresh_from_db()
+    assert inventory.store_price == Decimal("89.99")
+    assert inventory.brand.name == "other"
+    assert ProductInventory.objects.get(sku="new-sku").brand is None
+    assert get_version(f"product:{inventory.product.web_id}") > version
+
+    ProductInventoryImporter(on_conflict="ignore", use_copy=use_copy).run(
+        read_rows(path)
+    )
+    assert ProductInventory.objects.count() == 2
+
+
+@pytest.mark.parametrize("use_copy", [False, True])
+def test_import_keeps_columns_missing_from_file(
+    tmp_path, use_copy, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    product = inventory.product
+    product.description = "kept"
+    product.save()
+    products = write_csv(
+        tmp_path / "products.csv",
+        ["web_id,slug,name", f"{product.web_id},{product.slug},renamed"],
+    )
+    inventories = write_csv(
+        tmp_path / "inventory.csv",
+        [
+            "sku,upc,web_id,product_type,retail_price,store_price,weight",
+            f"{inventory.sku},{inventory.upc},{product.web_id},"
+            f"{inventory.product_type.name},199.99,89.99,1000",
+        ],
+    )
+
+    ProductImporter(use_copy=use_copy).run(read_rows(products))
+    ProductInventoryImporter(use_copy=use_copy).run(read_rows(inventories))
+
+    product.refresh_from_db()
+    assert (product.name, product.description) == ("renamed", "kept")
+    assert product.category is not None and product.is_active
+    inventory.refresh_from_db()
+    assert inventory.store_price == Decimal("89.99")
+    assert inventory.brand.name == "default"
+    assert inventory.is_active and inventory.is_default
+
+
+def test_import_reports_invalid_rows(
+    tmp_path, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    path = write_csv(
+        tmp_path / "stock.csv",
+        [
+            "sku,units,units_sold",
+            f"{inventory.sku},5,1",
+            "unknown,5,0",
+            f"{inventory.sku},many,0",
+        ],
+    )
+    stderr = io.StringIO()
+
+    with pytest.raises(CommandError, match="2 rows were not imported"):
+        call_command(
+            "catalog-import", "stock", path, stdout=io.StringIO(), stderr=stderr
+        )
+
+    assert Stock.objects.get(product_inventory=inventory).units == 5
+    assert f"{path}:3 sku: Unknown sku unknown." in stderr.getvalue()
+    assert f"{path}:4 units:" in stderr.getvalue()
+
+
+def test_import_gzipped_ndjson(tmp_path, single_sub_product_with_media_and_attributes):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    path = tmp_path / "attributes.ndjson.gz"
+    with gzip.open(path, "wt") as f:
+        for value in ("red", "blue", "red"):
+            f.write(
+                json.dumps({"sku": inventory.sku, "attribute": "color", "value": value})
+                + "\n"
+            )
+
+    call_command("catalog-import", "attributes", str(path), stdout=io.StringIO())
+
+    assert sorted(
+        inventory.attribute_values.values_list(
+            "product_attribute__name", "attribute_value"
+        )
+    ) == [("color", "blue"), ("color", "red"), ("default", "default")]
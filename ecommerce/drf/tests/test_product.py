@@ -1,6 +1,7 @@
 import json
 
 from ecommerce.drf.tests.utils import convert_to_dot_notation
+from ecommerce.inventory.models import Media, Product, ProductInventory
 
 
 def test_get_product_by_category(api_client, single_product):
@@ -14,7 +15,26 @@ def test_get_product_by_category(api_client, single_product):
         }
     ]
     assert response.status_code == 200
-    assert response.data == expected_json
+    assert response.data["results"] == expected_json
+
+
+def test_get_product_by_category_includes_descendants(
+    api_client, django_assert_num_queries, single_product
+):
+    parent = single_product.category.parent
+    Product.objects.create(
+        web_id="inactive", slug="inactive", name="inactive", category=parent
+    )
+    endpoint = f"/api/inventory/products/category/{parent.slug}/"
+
+    with django_assert_num_queries(2):
+        response = api_client().get(endpoint)
+
+    assert response.status_code == 200
+    assert [item["web_id"] for item in response.data["results"]] == [
+        single_product.web_id
+    ]
+    assert response.data["next"] is None
 
 
 def test_get_inventory_by_web_id(
@@ -48,7 +68,7 @@ def test_get_inventory_by_web_id(
                 {
                     "attribute_value": fixture.attribute.attribute_value,
                     "product_attribute": {
-                        "id": fixture.attribute.id,
+                        "id": fixture.attribute.product_attribute.id,
                         "name": fixture.attribute.product_attribute.name,
                         "description": fixture.attribute.product_attribute.description,
                     },
@@ -60,3 +80,68 @@ def test_get_inventory_by_web_id(
 
     assert response.status_code == 200
     assert json.loads(response.content) == expected_json
+
+
+def test_get_inventory_by_web_id_query_budget(
+    api_client, django_assert_num_queries, single_sub_product_with_media_and_attributes
+):
+    fixture = convert_to_dot_notation(single_sub_product_with_media_and_attributes)
+    endpoint = f"/api/inventory/{fixture.inventory.product.web_id}/"
+
+    for i in range(30):
+        variant = ProductInventory.objects.create(
+            sku=f"variant_{i}",
+            upc=f"variant_{i}",
+            product_type=fixture.inventory.product_type,
+            product=fixture.inventory.product,
+            brand=fixture.inventory.brand,
+            retail_price="199.99",
+            store_price="99.99",
+            weight=1000.0,
+        )
+        Media.objects.create(
+            product_inventory=variant, img_url="images/default.png", alt_text="default"
+        )
+        variant.attribute_values.add(fixture.attribute)
+
+    # inventory, media, attributes, promotion prices + promotion cache tags
+    with django_assert_num_queries(5):
+        response = api_client().get(endpoint)
+
+    assert response.status_code == 200
+    assert len(response.data) == 31
+
+
+def test_product_list_keyset_pages(api_client, single_category):
+    Product.objects.bulk_create(
+        Product(
+            web_id=f"keyset{i}",
+            slug=f"keyset{i}",
+            name=f"keyset{i}",
+            category=single_category,
+            is_active=i % 5 != 0,
+        )
+        for i in range(25)
+    )
+    expected = list(
+        Product.objects.filter(is_active=True)
+        .order_by("-created_at", "-id")
+        .values_list("web_id", flat=True)
+    )
+
+    web_ids = []
+    url = "/api/inventory/products/?limit=7&count=approximate"
+    while url:
+        response = api_client().get(url)
+        assert response.status_code == 200
+        assert isinstance(response.data["count"], int)
+        web_ids += [item["web_id"] for item in response.data["results"]]
+        url = response.data["next"]
+
+    assert web_ids == expected
+
+
+def test_product_list_invalid_cursor(api_client, db):
+    response = api_client().get("/api/inventory/products/?cursor=bogus")
+
+    assert response.status_code == 404
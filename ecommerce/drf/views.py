@@ -1,15 +1,40 @@
+import json
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from elasticsearch_dsl.serializer import serializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions, mixins
+from rest_framework.permissions import IsAuthenticated
 
+from ecommerce.inventory.export import EXPORT_FORMATS, export_rows
 from ecommerce.inventory.models import Category, Product, ProductInventory
-from ecommerce.drf.serializer import (
-    AllProducts,
-    ProductInventorySerializer,
-    CategorySerializer,
-    ProductSerializer,
+from ecommerce.drf.serializer import AllProducts, CategoryTreeSerializer
+from ecommerce.drf.fastserializer import (
+    CategoryValuesSerializer,
+    ProductInventoryValuesSerializer,
+    ProductValuesSerializer,
+)
+from ecommerce.drf.caching import (
+    CATEGORIES,
+    INVENTORIES,
+    PRODUCTS,
+    get_version,
+    get_versions,
+    tagged_cache,
+)
+from ecommerce.drf.conditional import (
+    conditional,
+    get_etag,
+    get_last_modified,
+    get_tag_validators,
 )
+from ecommerce.drf.pagination import IdCursorPagination, KeysetPagination
 
 
 class CategoryList(APIView):
@@ -17,29 +42,211 @@ class CategoryList(APIView):
     Return list of all categories
     """
 
+    @conditional("get_validators")
+    @tagged_cache("get_cache_tags")
     def get(self, request):
-        queryset = Category.objects.all()
-        serializer = CategorySerializer(queryset, many=True)
-        return Response(serializer.data)
+        rows = CategoryValuesSerializer.values(Category.objects.all())
+        return Response(CategoryValuesSerializer(rows).data)
+
+    def get_cache_tags(self):
+        return [CATEGORIES]
+
+    def get_validators(self, request):
+        return get_tag_validators(request, self.get_cache_tags())
+
+
+class CategoryTree(APIView):
+    """
+    Return the nested category tree, or the subtree under slug.
+    The rendered JSON is cached per tree version, bumped on Category writes,
+    conditional GETs are answered from the version
+    endpoint: api/inventory/category/tree/ and api/inventory/category/tree/<slug>/
+    """
+
+    @conditional("get_validators")
+    def get(self, request, slug=None):
+        version = get_version(CATEGORIES)
+        key = f"drf:category-tree:{version}:{slug or ''}"
+        content = cache.get(key)
+        if content is None:
+            content = json.dumps(self.get_tree(slug)).encode()
+            cache.set(key, content, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+
+        return HttpResponse(content, content_type="application/json")
+
+    def get_validators(self, request, slug=None):
+        return get_tag_validators(request, [CATEGORIES])
+
+    def get_tree(self, slug):
+        if slug is None:
+            queryset = Category.objects.all()
+        else:
+            queryset = get_object_or_404(Category, slug=slug).get_descendants(
+                include_self=True
+            )
+        return CategoryTreeSerializer(queryset.get_cached_trees(), many=True).data
 
 
 class ProductByCategory(APIView):
     """
-    Return product by category
+    Return active products of a category and all its descendants,
+    the subtree is a single tree_id/lft/rght range join
+    endpoint: api/inventory/products/category/<slug>/?cursor=&limit=
     """
 
+    pagination_class = IdCursorPagination
+
+    @conditional("get_validators")
+    @tagged_cache("get_cache_tags")
     def get(self, request, query=None):
-        queryset = Product.objects.filter(category__slug=query)
-        serializer = ProductSerializer(queryset, many=True)
-        return Response(serializer.data)
+        category = get_object_or_404(Category, slug=query)
+        queryset = Product.objects.filter(
+            category__tree_id=category.tree_id,
+            category__lft__gte=category.lft,
+            category__rght__lte=category.rght,
+            is_active=True,
+        )
+        paginator = self.pagination_class()
+        rows = ProductValuesSerializer.values(queryset, paginator.ordering)
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(ProductValuesSerializer(page).data)
+
+    def get_cache_tags(self, query=None):
+        # product writes bump the tags of their category and its ancestors
+        return [CATEGORIES, f"category:{query}"]
+
+    def get_validators(self, request, query=None):
+        return get_tag_validators(request, self.get_cache_tags(query))
+
+
+class ProductList(APIView):
+    """
+    Return active products, newest first, with keyset pagination
+    endpoint: api/inventory/products/?cursor=&limit=&count=approximate
+    """
+
+    pagination_class = KeysetPagination
+
+    @conditional("get_validators")
+    @tagged_cache("get_cache_tags")
+    def get(self, request):
+        paginator = self.pagination_class()
+        rows = ProductValuesSerializer.values(
+            Product.objects.filter(is_active=True), *paginator.get_field_names()
+        )
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(ProductValuesSerializer(page).data)
+
+    def get_cache_tags(self):
+        return [PRODUCTS]
+
+    def get_validators(self, request):
+        return get_tag_validators(request, self.get_cache_tags())
+
+
+class ProductInventoryList(APIView):
+    """
+    Return active sub products, newest first, with keyset pagination
+    endpoint: api/inventory/?cursor=&limit=&count=approximate
+    """
+
+    pagination_class = KeysetPagination
+
+    @conditional("get_validators")
+    @tagged_cache("get_cache_tags")
+    def get(self, request):
+        paginator = self.pagination_class()
+        rows = ProductInventoryValuesSerializer.values(
+            ProductInventory.objects.filter(is_active=True),
+            *paginator.get_field_names(),
+        )
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(
+            ProductInventoryValuesSerializer(page).data
+        )
+
+    def get_cache_tags(self):
+        # bumped by writes to sub products and everything the listing shows
+        return [INVENTORIES]
+
+    def get_validators(self, request):
+        return get_tag_validators(request, self.get_cache_tags())
 
 
 class ProductInventoryByWebId(APIView):
     """
-    Return Sub Product by WebId
+    Return Sub Product by WebId, conditional GET answers 304 from one
+    aggregate query
     """
 
+    @conditional("get_validators")
+    @tagged_cache("get_cache_tags")
     def get(self, requst, query=None):
-        queryset = ProductInventory.objects.filter(product__web_id=query)
-        serializer = ProductInventorySerializer(queryset, many=True)
-        return Response(serializer.data)
+        rows = ProductInventoryValuesSerializer.values(
+            ProductInventory.objects.filter(product__web_id=query)
+        )
+        return Response(ProductInventoryValuesSerializer(rows).data)
+
+    def get_cache_tags(self, query=None):
+        # collected by get_validators on this request
+        return self.tags
+
+    def get_validators(self, request, query=None):
+        """
+        Last change of the sub products, their product and the tags of their
+        stock, media and promotions from one aggregate query, which also
+        provides the cache tags of the response and their versions
+        """
+        state = ProductInventory.objects.filter(product__web_id=query).aggregate(
+            ids=ArrayAgg("id", distinct=True, default=[]),
+            promotion_ids=ArrayAgg(
+                "product_promotion__promotion_id", distinct=True, default=[]
+            ),
+            updated_at=Max("updated_at"),
+            product_updated_at=Max("product__updated_at"),
+        )
+        self.tags = (
+            [f"product:{query}"]
+            + [f"inventory:{id}" for id in state["ids"]]
+            + [f"promotion:{id}" for id in state["promotion_ids"] if id is not None]
+        )
+        versions = self.tag_versions = get_versions(self.tags)
+        last_modified = get_last_modified(
+            versions.values(), state["updated_at"], state["product_updated_at"]
+        )
+        etag = get_etag(
+            request.get_full_path(),
+            state["updated_at"],
+            state["product_updated_at"],
+            sorted(versions.items()),
+        )
+        return etag, last_modified
+
+
+class CatalogExport(APIView):
+    """
+    Stream every sub product with its product, brand, stock, attributes and
+    effective price, read through a server-side cursor so memory stays flat
+    endpoint: api/inventory/export/ndjson/ and api/inventory/export/csv/
+    ?active=true exports active sub products only
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            raise Http404
+        encode, content_type = EXPORT_FORMATS[export_format]
+        queryset = ProductInventory.objects.all()
+        if request.query_params.get("active") == "true":
+            queryset = queryset.filter(is_active=True)
+
+        return StreamingHttpResponse(
+            encode(export_rows(queryset)),
+            content_type=content_type,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="catalog.{export_format}"'
+                )
+            },
+        )
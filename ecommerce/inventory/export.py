@@ -0,0 +1,108 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ecommerce.promotion.pricing import get_promotion_prices
+
+from .models import ProductAttributeValue, ProductInventory
+
+EXPORT_CHUNK_SIZE = 2_000
+
+# column name -> ProductInventory values() path
+EXPORT_COLUMNS = {
+    "id": "id",
+    "sku": "sku",
+    "upc": "upc",
+    "web_id": "product__web_id",
+    "name": "product__name",
+    "category": "product__category__slug",
+    "brand": "brand__name",
+    "product_type": "product_type__name",
+    "is_active": "is_active",
+    "is_default": "is_default",
+    "retail_price": "retail_price",
+    "store_price": "store_price",
+    "weight": "weight",
+    "units": "stock__units",
+    "units_sold": "stock__units_sold",
+}
+
+EXPORT_FIELDS = [*EXPORT_COLUMNS, "promotion_price", "effective_price", "attributes"]
+
+
+def export_rows(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one dict per sub product with EXPORT_FIELDS. Rows are read through
+    a server-side cursor chunk_size at a time, attributes and promotion
+    prices are fetched per chunk, so memory does not grow with the catalog.
+    effective_price is the current promotion price, else the store price
+    """
+    if queryset is None:
+        queryset = ProductInventory.objects.all()
+    rows = (
+        queryset.order_by("id")
+        .values(*EXPORT_COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+
+    while chunk := list(islice(rows, chunk_size)):
+        ids = [row["id"] for row in chunk]
+        prices = get_promotion_prices(ids)
+        attributes = get_attributes(ids)
+        for row in chunk:
+            item = {name: row[path] for name, path in EXPORT_COLUMNS.items()}
+            item["promotion_price"] = prices.get(row["id"])
+            item["effective_price"] = prices.get(row["id"], row["store_price"])
+            item["attributes"] = attributes.get(row["id"], [])
+            yield item
+
+
+def get_attributes(inventory_ids):
+    """
+    Return {product_inventory_id: ["name:value", ...]}
+    """
+    rows = (
+        ProductAttributeValue.objects.filter(productinventory__in=inventory_ids)
+        .order_by("product_attribute__name", "attribute_value")
+        .values_list("productinventory", "product_attribute__name", "attribute_value")
+    )
+    attributes = {}
+    for inventory_id, name, value in rows:
+        attributes.setdefault(inventory_id, []).append(f"{name}:{value}")
+    return attributes
+
+
+def export_ndjson(rows):
+    """
+    Yield one JSON document per line, decimals as strings
+    """
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+class Echo:
+    """
+    File-like object handing back what csv.writer writes to it
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_csv(rows):
+    """
+    Yield a header line then one line per row, attributes joined with "|"
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row["attributes"] = "|".join(row["attributes"])
+        yield writer.writerow(row.values())
+
+
+EXPORT_FORMATS = {
+    "ndjson": (export_ndjson, "application/x-ndjson"),
+    "csv": (export_csv, "text/csv"),
+}
@@ -0,0 +1,640 @@
+import csv
+import gzip
+import io
+import json
+from contextlib import nullcontext
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, router, transaction
+
+from ecommerce.drf.caching import CATEGORIES, INVENTORIES, PRODUCTS, bump_versions
+
+from .models import (
+    Brand,
+    Category,
+    Media,
+    Product,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductAttributeValues,
+    ProductInventory,
+    ProductType,
+    ProductTypeAttribute,
+    Stock,
+)
+
+IMPORT_BATCH_SIZE = 5_000
+
+# COPY text format escapes
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def read_rows(path, file_format=None):
+    """
+    Yield (line number, row dict) from a CSV file with a header line or an
+    NDJSON file, gunzipped when the name ends with .gz. The format defaults
+    to the file extension
+    """
+    name = path[: -len(".gz")] if path.endswith(".gz") else path
+    file_format = file_format or name.rsplit(".", 1)[-1]
+    opener = gzip.open if path.endswith(".gz") else open
+
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif file_format in ("ndjson", "jsonl"):
+            for line, text in enumerate(f, 1):
+                if not text.strip():
+                    continue
+                try:
+                    yield line, json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line}: {e}")
+        else:
+            raise ValueError(f"Unknown format {file_format}")
+
+
+def get_or_create_ids(model, field, values):
+    """
+    Return {value: id} for the unique field of model, rows are created
+    for the missing values
+    """
+    values = set(values)
+    ids = dict(
+        model.objects.filter(**{f"{field}__in": values}).values_list(field, "id")
+    )
+    if missing := values - ids.keys():
+        model.objects.bulk_create(
+            [model(**{field: value}) for value in missing], ignore_conflicts=True
+        )
+        ids.update(
+            model.objects.filter(**{f"{field}__in": missing}).values_list(field, "id")
+        )
+    return ids
+
+
+def copy_objects(model, objs, unique_fields=(), update_fields=None):
+    """
+    Write objs with COPY into a temporary table, then INSERT ... SELECT into
+    the table of model with ON CONFLICT (unique_fields) updating
+    update_fields, or doing nothing when update_fields is None.
+    PostgreSQL only, must run in a transaction
+    """
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    columns = ", ".join(quote(field.column) for field in fields)
+    table = quote(model._meta.db_table)
+    temp_table = quote(f"import_{model._meta.db_table}")
+
+    buffer = io.StringIO()
+    for obj in objs:
+        values = []
+        for field in fields:
+            value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+            values.append(
+                r"\N" if value is None else str(value).translate(COPY_ESCAPES)
+            )
+        buffer.write("\t".join(values) + "\n")
+    buffer.seek(0)
+
+    sql = f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {temp_table}"
+    if unique_fields:
+        target = ", ".join(
+            quote(model._meta.get_field(name).column) for name in unique_fields
+        )
+        if update_fields is None:
+            sql += f" ON CONFLICT ({target}) DO NOTHING"
+        else:
+            assignments = ", ".join(
+                f"{column} = EXCLUDED.{column}"
+                for column in (
+                    quote(model._meta.get_field(name).column) for name in update_fields
+                )
+            )
+            sql += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {temp_table} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY {temp_table} ({columns}) FROM STDIN", buffer)
+        cursor.execute(sql)
+        written = cursor.rowcount
+        cursor.execute(f"DROP TABLE {temp_table}")
+    return written
+
+
+class BaseImporter:
+    """
+    Import rows of one kind in batches of batch_size: each batch is validated
+    with one lookup query per related model, invalid rows are reported with
+    their line number and skipped, valid rows are written with bulk_create,
+    or COPY with use_copy on PostgreSQL, in one transaction, which is
+    reported and skipped when the database rejects it. Rows are matched to
+    existing ones on unique_fields, on_conflict "update" overwrites the
+    update_fields whose columns are in the batch, "ignore" keeps the
+    existing rows
+    """
+
+    model = None
+    required = ()
+    optional = ()
+    unique_fields = ()
+    update_fields = ()
+    # update field -> column it is read from, when the names differ
+    update_columns = {}
+    cache_tags = ()
+
+    def __init__(
+        self, batch_size=IMPORT_BATCH_SIZE, on_conflict="update", use_copy=False
+    ):
+        self.batch_size = batch_size
+        self.on_conflict = on_conflict
+        self.use_copy = use_copy
+        self.rows = 0
+        self.written = 0
+        self.errors = []
+        self.tags = set()
+        self.columns = set()
+        # columns stored in a field of model, cleaned by that field
+        self.fields = {
+            field.name: field
+            for field in self.model._meta.concrete_fields
+            if not field.is_relation and field.name in (*self.required, *self.optional)
+        }
+
+    def run(self, rows):
+        """
+        Import an iterable of (line number, row dict)
+        """
+        rows = iter(rows)
+        with self.context():
+            while batch := list(islice(rows, self.batch_size)):
+                self.rows += len(batch)
+                try:
+                    with transaction.atomic():
+                        objs = self.validate(batch)
+                        if objs:
+                            self.written += self.write(objs)
+                except IntegrityError as e:
+                    # e.g. a upc already taken by another sku, the batch is skipped
+                    self.errors.append((batch[0][0], f"batch not imported: {e}"))
+                # bulk writes send no signals, cached responses are
+                # invalidated here
+                bump_versions(self.tags)
+                self.tags.clear()
+        self.finish()
+        bump_versions([*self.tags, *self.cache_tags])
+        return self
+
+    def context(self):
+        return nullcontext()
+
+    def validate(self, batch):
+        self.columns = {name for _, row in batch for name in row}
+        # CSV and NDJSON rows alike: strings, without empty values
+        batch = [
+            (
+                line,
+                {
+                    name: str(value)
+                    for name, value in row.items()
+                    if value not in (None, "")
+                },
+            )
+            for line, row in batch
+        ]
+        lookups = self.get_lookups([row for _, row in batch])
+        objs = {}
+        for line, row in batch:
+            values = {
+                name: row[name]
+                for name in (*self.required, *self.optional)
+                if name in row
+            }
+            try:
+                if missing := [name for name in self.required if name not in values]:
+                    raise ValidationError(
+                        {name: "This field is required." for name in missing}
+                    )
+                self.clean(values)
+                obj = self.build(values, lookups)
+            except ValidationError as e:
+                self.errors.append((line, self.format_error(e)))
+                continue
+            # the last row wins when a key repeats in the batch
+            objs[self.get_key(obj)] = obj
+        return list(objs.values())
+
+    def clean(self, values):
+        """
+        Convert the column values to python with the model fields and run
+        their validators
+        """
+        errors = {}
+        for name, field in self.fields.items():
+            if name in values:
+                try:
+                    values[name] = field.clean(values[name], None)
+                except ValidationError as e:
+                    errors[name] = e.messages
+        if errors:
+            raise ValidationError(errors)
+
+    def get_lookups(self, rows):
+        return {}
+
+    def build(self, values, lookups):
+        return self.model(**values)
+
+    def get_key(self, obj):
+        if not self.unique_fields:
+            return id(obj)
+        return tuple(
+            getattr(obj, self.model._meta.get_field(name).attname)
+            for name in self.unique_fields
+        )
+
+    def lookup(self, lookups, name, values, key):
+        try:
+            return lookups[name][values[key]]
+        except KeyError:
+            raise ValidationError({key: f"Unknown {key} {values[key]}."})
+
+    def get_update_fields(self):
+        """
+        update_fields read from a column of the batch, and those not read
+        from any column such as updated_at. Optional columns missing from a
+        file keep the existing values instead of the model defaults
+        """
+        if self.on_conflict != "update" or self.update_fields is None:
+            return None
+        return [
+            name
+            for name in self.update_fields
+            if (column := self.update_columns.get(name, name)) in self.columns
+            or column not in (*self.required, *self.optional)
+        ] or None
+
+    def write(self, objs):
+        update_fields = self.get_update_fields()
+        connection = connections[router.db_for_write(self.model)]
+        if self.use_copy and connection.vendor == "postgresql":
+            return copy_objects(self.model, objs, self.unique_fields, update_fields)
+        if not self.unique_fields:
+            return len(self.model.objects.bulk_create(objs))
+        if update_fields is None:
+            return len(self.model.objects.bulk_create(objs, ignore_conflicts=True))
+        return len(
+            self.model.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=update_fields,
+            )
+        )
+
+    def finish(self):
+        pass
+
+    def format_error(self, error):
+        if hasattr(error, "message_dict"):
+            return "; ".join(
+                f"{name}: {' '.join(messages)}"
+                for name, messages in error.message_dict.items()
+            )
+        return " ".join(error.messages)
+
+
+class CategoryImporter(BaseImporter):
+    """
+    Columns: slug, name, parent (slug), is_active. MPTT updates are deferred:
+    categories are inserted as roots, parents are set once every category
+    exists and the tree is rebuilt once at the end. Without a parent column,
+    or with on_conflict "ignore", existing categories keep their parent
+    """
+
+    model = Category
+    required = ("slug", "name")
+    optional = ("is_active",)
+    unique_fields = ("slug",)
+    update_fields = ("name", "is_active")
+    cache_tags = (CATEGORIES, PRODUCTS)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parents = {}
+
+    def context(self):
+        return Category.objects.disable_mptt_updates()
+
+    def validate(self, batch):
+        errors = len(self.errors)
+        objs = super().validate(batch)
+        failed = {line for line, _ in self.errors[errors:]}
+        slugs = {obj.slug for obj in objs}
+        if self.on_conflict == "ignore":
+            # existing categories keep their parent too
+            slugs -= set(
+                Category.objects.filter(slug__in=slugs).values_list("slug", flat=True)
+            )
+        for line, row in batch:
+            # rows without a parent column keep the existing parent
+            if line not in failed and row.get("slug") in slugs and "parent" in row:
+                self.parents[row["slug"]] = str(row["parent"] or "") or None
+        return objs
+
+    def build(self, values, lookups):
+        self.tags.add(f"category:{values['slug']}")
+        return Category(lft=0, rght=0, tree_id=0, level=0, **values)
+
+    def finish(self):
+        ids = dict(
+            Category.objects.filter(
+                slug__in={*self.parents, *filter(None, self.parents.values())}
+            ).values_list("slug", "id")
+        )
+        objs = []
+        for slug, parent in self.parents.items():
+            if slug not in ids:
+                continue
+            if parent is not None and parent not in ids:
+                self.errors.append(
+                    (None, f"parent: Unknown parent {parent} of {slug}.")
+                )
+                continue
+            objs.append(Category(id=ids[slug], parent_id=ids.get(parent)))
+        with transaction.atomic():
+            Category.objects.bulk_update(objs, ["parent"], batch_size=self.batch_size)
+        Category.objects.rebuild()
+        self.tags.update(f"category:{slug}" for slug in ids)
+
+
+class ProductImporter(BaseImporter):
+    """
+    Columns: web_id, slug, name, description, category (slug), is_active
+    """
+
+    model = Product
+    required = ("web_id", "slug", "name")
+    optional = ("description", "category", "is_active")
+    unique_fields = ("web_id",)
+    update_fields = (
+        "slug",
+        "name",
+        "description",
+        "category",
+        "is_active",
+        "updated_at",
+    )
+    cache_tags = (CATEGORIES, PRODUCTS, INVENTORIES)
+
+    def get_lookups(self, rows):
+        slugs = {row["category"] for row in rows if row.get("category")}
+        return {
+            "categories": dict(
+                Category.objects.filter(slug__in=slugs).values_list("slug", "id")
+            )
+        }
+
+    def build(self, values, lookups):
+        if "category" in values:
+            values["category_id"] = self.lookup(
+                lookups, "categories", values, "category"
+            )
+            del values["category"]
+        values.setdefault("description", "")
+        product = Product(**values)
+        self.tags.add(f"product:{product.web_id}")
+        return product
+
+
+class ProductInventoryImporter(BaseImporter):
+    """
+    Columns: sku, upc, web_id, product_type (name), brand (name), is_active,
+    is_default, retail_price, store_price, is_digital, weight. Missing
+    product types and brands are created
+    """
+
+    model = ProductInventory
+    required = (
+        "sku",
+        "upc",
+        "web_id",
+        "product_type",
+        "retail_price",
+        "store_price",
+        "weight",
+    )
+    optional = ("brand", "is_active", "is_default", "is_digital")
+    unique_fields = ("sku",)
+    update_fields = (
+        "upc",
+        "product",
+        "product_type",
+        "brand",
+        "is_active",
+        "is_default",
+        "retail_price",
+        "store_price",
+        "is_digital",
+        "weight",
+        "updated_at",
+    )
+    update_columns = {"product": "web_id"}
+    cache_tags = (INVENTORIES,)
+
+    def get_lookups(self, rows):
+        web_ids = {row["web_id"] for row in rows if row.get("web_id")}
+        return {
+            "products": dict(
+                Product.objects.filter(web_id__in=web_ids).values_list("web_id", "id")
+            ),
+            "product_types": get_or_create_ids(
+                ProductType,
+                "name",
+                (row["product_type"] for row in rows if row.get("product_type")),
+            ),
+            "brands": get_or_create_ids(
+                Brand, "name", (row["brand"] for row in rows if row.get("brand"))
+            ),
+        }
+
+    def build(self, values, lookups):
+        web_id = values.pop("web_id")
+        values["product_id"] = self.lookup(
+            lookups, "products", {"web_id": web_id}, "web_id"
+        )
+        values["product_type_id"] = self.lookup(
+            lookups, "product_types", values, "product_type"
+        )
+        del values["product_type"]
+        if "brand" in values:
+            values["brand_id"] = lookups["brands"][values.pop("brand")]
+        self.tags.add(f"product:{web_id}")
+        return ProductInventory(**values)
+
+
+class InventoryRowImporter(BaseImporter):
+    """
+    Rows of a sub product, identified by the sku column
+    """
+
+    def get_lookups(self, rows):
+        skus = {row["sku"] for row in rows if row.get("sku")}
+        return {
+            "inventories": dict(
+                ProductInventory.objects.filter(sku__in=skus).values_list("sku", "id")
+            )
+        }
+
+    def get_inventory_id(self, values, lookups):
+        inventory_id = self.lookup(lookups, "inventories", values, "sku")
+        del values["sku"]
+        self.tags.add(f"inventory:{inventory_id}")
+        return inventory_id
+
+
+class MediaImporter(InventoryRowImporter):
+    """
+    Columns: sku, img_url, alt_text, is_feature. Images already attached
+    to the sub product are left unchanged
+    """
+
+    model = Media
+    required = ("sku", "img_url", "alt_text")
+    optional = ("is_feature",)
+    cache_tags = (INVENTORIES,)
+
+    def validate(self, batch):
+        objs = super().validate(batch)
+        existing = set(
+            Media.objects.filter(
+                product_inventory_id__in={obj.product_inventory_id for obj in objs}
+            ).values_list("product_inventory_id", "img_url")
+        )
+        return [
+            obj
+            for obj in objs
+            if (obj.product_inventory_id, obj.img_url.name) not in existing
+        ]
+
+    def build(self, values, lookups):
+        inventory_id = self.get_inventory_id(values, lookups)
+        return Media(product_inventory_id=inventory_id, **values)
+
+    def get_key(self, obj):
+        return (obj.product_inventory_id, obj.img_url.name)
+
+
+class StockImporter(InventoryRowImporter):
+    """
+    Columns: sku, units, units_sold, last_checked
+    """
+
+    model = Stock
+    required = ("sku", "units")
+    optional = ("units_sold", "last_checked")
+    unique_fields = ("product_inventory",)
+    update_fields = ("units", "units_sold", "last_checked")
+
+    def build(self, values, lookups):
+        inventory_id = self.get_inventory_id(values, lookups)
+        return Stock(product_inventory_id=inventory_id, **values)
+
+
+class AttributeImporter(InventoryRowImporter):
+    """
+    Columns: sku, attribute (name), value. Links a sub product to an
+    attribute value, missing attributes and values are created
+    """
+
+    model = ProductAttributeValues
+    required = ("sku", "attribute", "value")
+    unique_fields = ("attributevalues", "productinventory")
+    # links have nothing to update
+    update_fields = None
+    cache_tags = (INVENTORIES,)
+
+    def get_lookups(self, rows):
+        lookups = super().get_lookups(rows)
+        rows = [row for row in rows if row.get("attribute") and row.get("value")]
+        attributes = get_or_create_ids(
+            ProductAttribute, "name", (row["attribute"] for row in rows)
+        )
+        pairs = {(attributes[row["attribute"]], row["value"]) for row in rows}
+        values = {
+            (attribute_id, value): id
+            for id, attribute_id, value in ProductAttributeValue.objects.filter(
+                product_attribute_id__in={attribute_id for attribute_id, _ in pairs},
+                attribute_value__in={value for _, value in pairs},
+            ).values_list("id", "product_attribute_id", "attribute_value")
+        }
+        if missing := pairs - values.keys():
+            for value in ProductAttributeValue.objects.bulk_create(
+                ProductAttributeValue(
+                    product_attribute_id=attribute_id, attribute_value=value
+                )
+                for attribute_id, value in missing
+            ):
+                values[(value.product_attribute_id, value.attribute_value)] = value.id
+        lookups["attributes"] = attributes
+        lookups["values"] = values
+        return lookups
+
+    def build(self, values, lookups):
+        inventory_id = self.get_inventory_id(values, lookups)
+        attribute_id = lookups["attributes"][values["attribute"]]
+        return ProductAttributeValues(
+            productinventory_id=inventory_id,
+            attributevalues_id=lookups["values"][(attribute_id, values["value"])],
+        )
+
+
+class ProductTypeAttributeImporter(BaseImporter):
+    """
+    Columns: product_type (name), attribute (name). Links the attributes
+    that describe a product type, missing ones are created
+    """
+
+    model = ProductTypeAttribute
+    required = ("product_type", "attribute")
+    unique_fields = ("product_attribute", "product_type")
+    update_fields = None
+
+    def get_lookups(self, rows):
+        return {
+            "product_types": get_or_create_ids(
+                ProductType,
+                "name",
+                (row["product_type"] for row in rows if row.get("product_type")),
+            ),
+            "attributes": get_or_create_ids(
+                ProductAttribute,
+                "name",
+                (row["attribute"] for row in rows if row.get("attribute")),
+            ),
+        }
+
+    def build(self, values, lookups):
+        return ProductTypeAttribute(
+            product_type_id=lookups["product_types"][values["product_type"]],
+            product_attribute_id=lookups["attributes"][values["attribute"]],
+        )
+
+
+# kinds in dependency order
+IMPORTERS = {
+    "categories": CategoryImporter,
+    "products": ProductImporter,
+    "inventory": ProductInventoryImporter,
+    "media": MediaImporter,
+    "stock": StockImporter,
+    "attributes": AttributeImporter,
+    "type_attributes": ProductTypeAttributeImporter,
+}
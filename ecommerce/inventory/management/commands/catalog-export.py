@@ -0,0 +1,64 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from ecommerce.inventory.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_rows
+from ecommerce.inventory.models import ProductInventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream every sub product with its product, brand, stock, attributes "
+        "and effective price as NDJSON or CSV, gzipped when the output ends "
+        "with .gz or with --gzip"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="file path, - for stdout")
+        parser.add_argument(
+            "--format", choices=sorted(EXPORT_FORMATS), default="ndjson"
+        )
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--active", action="store_true", help="active only")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        encode, _ = EXPORT_FORMATS[options["format"]]
+        queryset = ProductInventory.objects.all()
+        if options["active"]:
+            queryset = queryset.filter(is_active=True)
+
+        compress = options["gzip"] or options["output"].endswith(".gz")
+        if options["output"] == "-":
+            raw = sys.stdout.buffer
+        else:
+            raw = open(options["output"], "wb")
+
+        rows = 0
+
+        def count(items):
+            nonlocal rows
+            for item in items:
+                rows += 1
+                yield item
+
+        started = time.perf_counter()
+        try:
+            out = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+            try:
+                for line in encode(count(export_rows(queryset, options["chunk_size"]))):
+                    out.write(line.encode())
+            finally:
+                if compress:
+                    out.close()
+        finally:
+            if raw is not sys.stdout.buffer:
+                raw.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f"Exported {rows} rows in {elapsed:.1f}s "
+            f"({rows / max(elapsed, 0.001):,.0f} rows/s)"
+        )
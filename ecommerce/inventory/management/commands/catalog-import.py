@@ -0,0 +1,89 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ecommerce.inventory.importing import IMPORT_BATCH_SIZE, IMPORTERS, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import catalog rows from CSV or NDJSON files (optionally gzipped) "
+        "in batches, instead of loaddata. Either one kind and its file, or "
+        "--dir with files named after the kinds, imported in dependency order: "
+        + ", ".join(IMPORTERS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", nargs="?", choices=list(IMPORTERS))
+        parser.add_argument("path", nargs="?")
+        parser.add_argument(
+            "--dir", help="directory of <kind>.csv / <kind>.ndjson[.gz] files"
+        )
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            "--on-conflict",
+            choices=["update", "ignore"],
+            default="update",
+            help="rows matching existing ones on their natural key",
+        )
+        parser.add_argument(
+            "--copy", action="store_true", help="write batches with COPY"
+        )
+        parser.add_argument(
+            "--max-errors", type=int, default=20, help="invalid rows to print"
+        )
+
+    def handle(self, *args, **options):
+        if options["dir"]:
+            files = self.find_files(options["dir"])
+        elif options["kind"] and options["path"]:
+            files = [(options["kind"], options["path"])]
+        else:
+            raise CommandError("Give a kind and a path, or --dir")
+
+        errors = 0
+        for kind, path in files:
+            errors += self.import_file(kind, path, options)
+
+        self.stdout.write(
+            "Bulk writes send no signals: run search-reindex to refresh the "
+            "search index"
+        )
+        if errors:
+            raise CommandError(f"{errors} rows were not imported")
+
+    def find_files(self, directory):
+        files = []
+        for kind in IMPORTERS:
+            for extension in ("csv", "ndjson", "csv.gz", "ndjson.gz"):
+                path = os.path.join(directory, f"{kind}.{extension}")
+                if os.path.exists(path):
+                    files.append((kind, path))
+        if not files:
+            raise CommandError(f"No catalog files in {directory}")
+        return files
+
+    def import_file(self, kind, path, options):
+        importer = IMPORTERS[kind](
+            batch_size=options["batch_size"],
+            on_conflict=options["on_conflict"],
+            use_copy=options["copy"],
+        )
+
+        started = time.perf_counter()
+        try:
+            importer.run(read_rows(path, options["format"]))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"{path}: {e}")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{kind}: {importer.rows} rows, {importer.written} written, "
+            f"{len(importer.errors)} invalid in {elapsed:.1f}s "
+            f"({importer.rows / max(elapsed, 0.001):,.0f} rows/s)"
+        )
+        for line, message in importer.errors[: options["max_errors"]]:
+            self.stderr.write(f"  {path}:{line or '-'} {message}")
+        return len(importer.errors)
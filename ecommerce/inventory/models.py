@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -48,6 +50,12 @@ class Category(MPTTModel):
         ordering = ["name"]
         verbose_name = _("product category")
         verbose_name_plural = _("product categories")
+        indexes = [
+            # subtree lookups: tree_id = x AND lft BETWEEN ... AND rght <= ...
+            models.Index(
+                fields=["tree_id", "lft", "rght"], name="category_tree_range_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -116,6 +124,26 @@ class Product(models.Model):
         help_text=_("format: Y-m-d H:M:S"),
     )
 
+    class Meta:
+        indexes = [
+            # expression matched by PostgresBackend full-text search
+            GinIndex(
+                SearchVector("name", "web_id", config="english"),
+                name="product_search_vector_idx",
+            ),
+            # active products of a category page by id
+            models.Index(
+                fields=["category", "is_active", "id"],
+                name="product_category_active_idx",
+            ),
+            # keyset pages of active products, newest first
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="product_active_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -303,6 +331,16 @@ class ProductInventory(models.Model):
         help_text=_("format: Y-m-d H:M:S"),
     )
 
+    class Meta:
+        indexes = [
+            # keyset pages of active sub products, newest first
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="inventory_active_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.sku
 
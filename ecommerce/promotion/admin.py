@@ -1,7 +1,8 @@
 from django.contrib import admin
+from django.db import transaction
 
 from . import models
-from .tasks import promotion_prices, promotion_management
+from .scheduling import request_promotion_reprice
 
 
 class ProductOnPromotion(admin.StackedInline):
@@ -13,12 +14,12 @@ class ProductOnPromotion(admin.StackedInline):
 class ProductInventoryList(admin.ModelAdmin):
     model = models.Promotion
     inlines = [ProductOnPromotion]
-    list_display = ("name", "is_active", "promo_start", "promo_end")
+    list_display = ("name", "is_active", "is_pricing", "promo_start", "promo_end")
 
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-        promotion_prices.delay(obj.promo_reduction, obj.id)
-        promotion_management.delay()
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        promotion_id = form.instance.id
+        transaction.on_commit(lambda: request_promotion_reprice(promotion_id))
 
 
 admin.site.register(models.Promotion, ProductInventoryList)
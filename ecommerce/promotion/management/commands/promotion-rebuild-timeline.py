@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from ecommerce.promotion.models import PriceTimeline, Promotion
+from ecommerce.promotion.pricing import rebuild_price_timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the PriceTimeline rows of every active and scheduled promotion "
+        "from ProductsOnPromotion and drop the rows of the others. Run after "
+        "migrate on deploy and after loading promotions outside the promotion tasks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("promotion_ids", nargs="*", type=int)
+
+    def handle(self, *args, **options):
+        promotions = Promotion.objects.filter(Q(is_active=True) | Q(is_schedule=True))
+        stale = PriceTimeline.objects.exclude(promotion__in=promotions)
+        if options["promotion_ids"]:
+            promotions = promotions.filter(id__in=options["promotion_ids"])
+            stale = stale.filter(promotion_id__in=options["promotion_ids"])
+
+        deleted = stale.delete()[0]
+        created = 0
+        for promotion_id in promotions.order_by("id").values_list("id", flat=True):
+            created += rebuild_price_timeline(promotion_id)
+        self.stdout.write(
+            f"Price timeline: {created} rows rebuilt, {deleted} stale rows deleted"
+        )
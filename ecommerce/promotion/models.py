@@ -26,6 +26,7 @@ class Promotion(models.Model):
     promo_reduction = models.IntegerField(default=0)
     is_active = models.BooleanField(default=False)
     is_schedule = models.BooleanField(default=False)
+    is_pricing = models.BooleanField(default=False)
     promo_start = models.DateField()
     promo_end = models.DateField()
     products_on_promotion = models.ManyToManyField(
@@ -77,3 +78,34 @@ class ProductsOnPromotion(models.Model):
 
     class Meta:
         unique_together = (("product_inventory_id", "promotion_id"),)
+
+
+class PriceTimeline(models.Model):
+    """
+    Promotion price of a SKU over a date range, maintained by the promotion tasks
+    """
+
+    product_inventory = models.ForeignKey(
+        ProductInventory,
+        related_name="price_timeline",
+        on_delete=models.CASCADE,
+    )
+    promotion = models.ForeignKey(
+        Promotion,
+        related_name="price_timeline",
+        on_delete=models.CASCADE,
+    )
+    valid_from = models.DateField()
+    valid_to = models.DateField()
+    effective_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product_inventory", "valid_from", "valid_to"],
+                name="price_timeline_lookup_idx",
+            ),
+        ]
@@ -0,0 +1,204 @@
+from datetime import date, datetime
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Ceil
+
+from ecommerce.inventory.models import ProductInventory
+
+from .models import PriceTimeline, ProductsOnPromotion, Promotion
+
+TIMELINE_BATCH_SIZE = 5_000
+
+
+def get_promotion_prices(inventory_ids, at=None):
+    """
+    Return {product_inventory_id: promo_price} for the given inventory ids
+    on date at (default today) in a single range scan of PriceTimeline.
+    When a SKU sits in several promotions the lowest price wins,
+    ties are broken by the lowest promotion id
+    """
+    at = at or datetime.now().date()
+    rows = (
+        PriceTimeline.objects.filter(
+            product_inventory_id__in=set(inventory_ids),
+            valid_from__lte=at,
+            valid_to__gte=at,
+        )
+        .order_by("product_inventory_id", "effective_price", "promotion_id")
+        .values_list("product_inventory_id", "effective_price")
+    )
+
+    prices = {}
+    for inventory_id, promo_price in rows:
+        prices.setdefault(inventory_id, promo_price)
+    return prices
+
+
+def get_chunk_ranges(promotion_id, chunk_size):
+    """
+    Split the ProductsOnPromotion rows of a promotion into id ranges
+    of at most chunk_size ids
+    """
+    bounds = ProductsOnPromotion.objects.filter(promotion_id=promotion_id).aggregate(
+        first_id=Min("id"), last_id=Max("id")
+    )
+    if bounds["first_id"] is None:
+        return []
+    return [
+        (start, min(start + chunk_size - 1, bounds["last_id"]))
+        for start in range(bounds["first_id"], bounds["last_id"] + 1, chunk_size)
+    ]
+
+
+def reprice_promotion(promotion_id, reduction_amount, id_range=None):
+    """
+    Recompute promo_price = ceil(store_price * (100 - reduction) / 100)
+    for every non-overridden SKU of the promotion in a single UPDATE.
+    id_range=(first_id, last_id) limits the UPDATE to a chunk of
+    ProductsOnPromotion rows. Return the number of rows whose price changed
+    """
+    new_price = Subquery(
+        ProductInventory.objects.filter(pk=OuterRef("product_inventory_id"))
+        .annotate(
+            new_price=Ceil(
+                ExpressionWrapper(
+                    F("store_price") * Value(100 - reduction_amount) / Value(100),
+                    output_field=DecimalField(max_digits=10, decimal_places=2),
+                )
+            )
+        )
+        .values("new_price")[:1],
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    queryset = ProductsOnPromotion.objects.filter(
+        promotion_id=promotion_id, price_override=False
+    )
+    if id_range is not None:
+        queryset = queryset.filter(id__range=id_range)
+    return (
+        queryset.annotate(new_price=new_price)
+        .exclude(promo_price=F("new_price"))
+        .update(promo_price=new_price)
+    )
+
+
+def get_timeline_window(promotion):
+    """
+    Dates a promotion prices its SKUs: scheduled promotions follow their
+    dates, manually activated ones apply until deactivated
+    """
+    if promotion.is_schedule:
+        return promotion.promo_start, promotion.promo_end
+    if promotion.is_active:
+        return date.min, date.max
+    return None
+
+
+def rebuild_price_timeline(promotion_id, id_range=None):
+    """
+    Replace the PriceTimeline rows of a promotion (or of the ProductsOnPromotion
+    id_range chunk of it) with its current promo prices
+    """
+    promotion = Promotion.objects.get(id=promotion_id)
+    window = get_timeline_window(promotion)
+
+    products_on_promotion = ProductsOnPromotion.objects.filter(
+        promotion_id=promotion_id
+    )
+    timeline = PriceTimeline.objects.filter(promotion_id=promotion_id)
+    if id_range is not None:
+        products_on_promotion = products_on_promotion.filter(id__range=id_range)
+        timeline = timeline.filter(
+            product_inventory_id__in=products_on_promotion.values(
+                "product_inventory_id"
+            )
+        )
+
+    with transaction.atomic():
+        timeline.delete()
+        if window is None:
+            return 0
+        return create_price_timeline(promotion_id, window, products_on_promotion)
+
+
+def sync_price_timeline(promotion_id, inventory_ids):
+    """
+    Replace the PriceTimeline rows of some SKUs of a promotion, for
+    ProductsOnPromotion writes that do not go through the promotion tasks
+    """
+    promotion = Promotion.objects.filter(id=promotion_id).first()
+    window = get_timeline_window(promotion) if promotion else None
+
+    with transaction.atomic():
+        PriceTimeline.objects.filter(
+            promotion_id=promotion_id, product_inventory_id__in=inventory_ids
+        ).delete()
+        if window is None:
+            return 0
+        return create_price_timeline(
+            promotion_id,
+            window,
+            ProductsOnPromotion.objects.filter(
+                promotion_id=promotion_id, product_inventory_id__in=inventory_ids
+            ),
+        )
+
+
+def create_price_timeline(promotion_id, window, products_on_promotion):
+    """
+    Insert one PriceTimeline row over window per ProductsOnPromotion row
+    """
+    rows = products_on_promotion.values_list(
+        "product_inventory_id", "promo_price"
+    ).iterator(chunk_size=TIMELINE_BATCH_SIZE)
+    entries = (
+        PriceTimeline(
+            product_inventory_id=inventory_id,
+            promotion_id=promotion_id,
+            valid_from=window[0],
+            valid_to=window[1],
+            effective_price=promo_price,
+        )
+        for inventory_id, promo_price in rows
+    )
+
+    created = 0
+    while batch := list(islice(entries, TIMELINE_BATCH_SIZE)):
+        PriceTimeline.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def move_price_timeline(promotion_id, window):
+    """
+    Move the PriceTimeline rows of a promotion to a new window in one UPDATE
+    """
+    return PriceTimeline.objects.filter(promotion_id=promotion_id).update(
+        valid_from=window[0], valid_to=window[1]
+    )
+
+
+def prune_price_timeline(promotion_id):
+    """
+    Drop PriceTimeline rows of SKUs that were removed from the promotion
+    """
+    return (
+        PriceTimeline.objects.filter(promotion_id=promotion_id)
+        .exclude(
+            product_inventory_id__in=ProductsOnPromotion.objects.filter(
+                promotion_id=promotion_id
+            ).values("product_inventory_id")
+        )
+        .delete()[0]
+    )
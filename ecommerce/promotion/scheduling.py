@@ -0,0 +1,121 @@
+from datetime import datetime, time, timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Promotion
+from .signals import promotion_status_changed
+
+
+REPRICE_TOKEN_KEY = "promotion:{}:reprice-token"
+REPRICE_LOCK_KEY = "promotion:{}:reprice-lock"
+
+
+def request_promotion_reprice(promotion_id):
+    """
+    Debounced reprice of a single promotion: every request replaces the
+    latest token and queues a delayed task, only the task holding the
+    latest token does the work
+    """
+    from .tasks import promotion_reprice
+
+    token = uuid4().hex
+    cache.set(REPRICE_TOKEN_KEY.format(promotion_id), token, timeout=None)
+    promotion_reprice.apply_async(
+        (promotion_id, token), countdown=settings.PROMOTION_REPRICE_DEBOUNCE
+    )
+    return token
+
+
+def release_reprice_lock(promotion_id, token):
+    """
+    Release the reprice lock of a promotion if token still holds it,
+    an expired lock may have been taken by another task since
+    """
+    lock_key = REPRICE_LOCK_KEY.format(promotion_id)
+    if token is not None and cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def sweep_promotions(promotion_ids=None, today=None):
+    """
+    Bring is_active/is_schedule of scheduled promotions in line with their
+    dates, updating only the rows whose state changes.
+    Return {"activated": [ids], "deactivated": [ids]}
+    """
+    today = today or datetime.now().date()
+
+    with transaction.atomic():
+        promotions = Promotion.objects.select_for_update().filter(is_schedule=True)
+        if promotion_ids is not None:
+            promotions = promotions.filter(id__in=promotion_ids)
+
+        ended = list(
+            promotions.filter(promo_end__lt=today).values_list("id", "is_active")
+        )
+        activated = list(
+            promotions.filter(
+                promo_start__lte=today, promo_end__gte=today, is_active=False
+            ).values_list("id", flat=True)
+        )
+        upcoming = list(
+            promotions.filter(promo_start__gt=today, is_active=True).values_list(
+                "id", flat=True
+            )
+        )
+
+        Promotion.objects.filter(id__in=[id for id, _ in ended]).update(
+            is_active=False, is_schedule=False
+        )
+        Promotion.objects.filter(id__in=activated).update(is_active=True)
+        Promotion.objects.filter(id__in=upcoming).update(is_active=False)
+
+    changes = {
+        "activated": activated,
+        "deactivated": [id for id, is_active in ended if is_active] + upcoming,
+    }
+    if changes["activated"] or changes["deactivated"]:
+        promotion_status_changed.send(sender=Promotion, **changes)
+    return changes
+
+
+def schedule_promotion(promotion):
+    """
+    Enqueue promotion_status tasks at the moments the promotion starts
+    and ends, the tasks are idempotent so rescheduling is harmless.
+    Moments further than PROMOTION_STATUS_ETA_HORIZON seconds ahead are left
+    to schedule_promotions
+    """
+    from .tasks import promotion_status
+
+    if not promotion.is_schedule:
+        return []
+
+    now = datetime.now()
+    horizon = now + timedelta(seconds=settings.PROMOTION_STATUS_ETA_HORIZON)
+    boundaries = [
+        datetime.combine(promotion.promo_start, time.min),
+        datetime.combine(promotion.promo_end + timedelta(days=1), time.min),
+    ]
+    return [
+        promotion_status.apply_async((promotion.id,), eta=eta)
+        for eta in boundaries
+        if now < eta <= horizon
+    ]
+
+
+def schedule_promotions():
+    """
+    Enqueue the promotion_status tasks of the scheduled promotions starting
+    or ending at the next midnight
+    """
+    next_day = datetime.now().date() + timedelta(days=1)
+    promotions = Promotion.objects.filter(is_schedule=True).filter(
+        Q(promo_start=next_day) | Q(promo_end=next_day - timedelta(days=1))
+    )
+    return [
+        result for promotion in promotions for result in schedule_promotion(promotion)
+    ]
@@ -0,0 +1,66 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import PriceTimeline, ProductsOnPromotion, Promotion
+from .pricing import (
+    get_timeline_window,
+    move_price_timeline,
+    rebuild_price_timeline,
+    sync_price_timeline,
+)
+
+# Sent once the prices of a promotion have been recomputed,
+# kwargs: promotion_id, changed
+promotion_prices_changed = Signal()
+
+# Sent when scheduled promotions start or stop,
+# kwargs: activated, deactivated (lists of promotion ids)
+promotion_status_changed = Signal()
+
+
+@receiver(pre_save, sender=Promotion)
+def remember_timeline_window(sender, instance, raw=False, **kwargs):
+    previous = (
+        Promotion.objects.filter(pk=instance.pk).first()
+        if instance.pk and not raw
+        else None
+    )
+    instance._previous_timeline_window = (
+        get_timeline_window(previous) if previous else None
+    )
+
+
+@receiver(post_save, sender=Promotion)
+def update_promotion_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        return
+    previous = getattr(instance, "_previous_timeline_window", None)
+    window = get_timeline_window(instance)
+    if window == previous:
+        return
+    if window is not None and previous is not None:
+        move_price_timeline(instance.id, window)
+    else:
+        rebuild_price_timeline(instance.id)
+
+
+@receiver(post_save, sender=ProductsOnPromotion)
+@receiver(post_delete, sender=ProductsOnPromotion)
+def update_product_timeline(sender, instance, **kwargs):
+    sync_price_timeline(instance.promotion_id_id, [instance.product_inventory_id_id])
+
+
+@receiver(m2m_changed, sender=Promotion.products_on_promotion.through)
+def update_products_timeline(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        if pk_set is None:
+            rebuild_price_timeline(instance.id)
+        else:
+            sync_price_timeline(instance.id, pk_set)
+    elif pk_set is None:
+        PriceTimeline.objects.filter(product_inventory_id=instance.id).delete()
+    else:
+        for promotion_id in pk_set:
+            sync_price_timeline(promotion_id, [instance.id])
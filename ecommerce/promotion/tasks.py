@@ -1,41 +1,153 @@
-from datetime import datetime
-from decimal import Decimal
-from math import ceil
+import logging
 
-from celery import shared_task
+from celery import chord, shared_task
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 from .models import Promotion
+from .pricing import (
+    get_chunk_ranges,
+    prune_price_timeline,
+    rebuild_price_timeline,
+    reprice_promotion,
+)
+from .scheduling import (
+    REPRICE_LOCK_KEY,
+    REPRICE_TOKEN_KEY,
+    release_reprice_lock,
+    schedule_promotion,
+    schedule_promotions,
+    sweep_promotions,
+)
+from .signals import promotion_prices_changed
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task()
 def promotion_prices(reduction_amount, obj_id):
     with transaction.atomic():
-        promotions = Promotion.products_on_promotion.through.objects.filter(
-            promotion_id=obj_id
+        changed = reprice_promotion(obj_id, reduction_amount)
+        rebuild_price_timeline(obj_id)
+    promotion_prices_changed.send(
+        sender=Promotion, promotion_id=obj_id, changed=changed
+    )
+    return changed
+
+
+@shared_task()
+def promotion_prices_chunk(reduction_amount, obj_id, first_id, last_id):
+    with transaction.atomic():
+        changed = reprice_promotion(
+            obj_id, reduction_amount, id_range=(first_id, last_id)
         )
-        reduction = reduction_amount / 100
+        rebuild_price_timeline(obj_id, id_range=(first_id, last_id))
+    return changed
+
+
+@shared_task()
+def promotion_prices_finalize(results, obj_id, lock_token=None):
+    changed = sum(results)
+    prune_price_timeline(obj_id)
+    Promotion.objects.filter(id=obj_id).update(is_pricing=False)
+    release_reprice_lock(obj_id, lock_token)
+    promotion_prices_changed.send(
+        sender=Promotion, promotion_id=obj_id, changed=changed
+    )
+    return changed
+
+
+@shared_task()
+def promotion_prices_failed(request, exc, traceback, obj_id, lock_token=None):
+    """
+    Error callback of the promotion_prices_fanout chord: clear is_pricing and
+    invalidate what the chunks that did commit changed
+    """
+    logger.error(
+        "Repricing promotion %s failed in task %s: %r", obj_id, request.id, exc
+    )
+    Promotion.objects.filter(id=obj_id).update(is_pricing=False)
+    release_reprice_lock(obj_id, lock_token)
+    promotion_prices_changed.send(sender=Promotion, promotion_id=obj_id, changed=None)
+
+
+@shared_task()
+def promotion_prices_fanout(reduction_amount, obj_id, chunk_size=None, lock_token=None):
+    """
+    Reprice a promotion as a chord of id-range chunks, progress is available
+    per chunk from the returned group id. The reprice lock held by
+    lock_token is released once the chord finishes or fails
+    """
+    chunks = get_chunk_ranges(
+        obj_id, chunk_size or settings.PROMOTION_PRICES_CHUNK_SIZE
+    )
+    Promotion.objects.filter(id=obj_id).update(is_pricing=True)
+    if not chunks:
+        promotion_prices_finalize([], obj_id, lock_token)
+        return None
 
-        for promo in promotions:
-            if promo.price_override == False:
-                store_price = promo.product_inventory_id.store_price
-                new_price = ceil(store_price - (store_price * Decimal(reduction)))
-                promo.promo_price = Decimal(new_price)
-                promo.save()
+    header = [
+        promotion_prices_chunk.s(reduction_amount, obj_id, first_id, last_id)
+        for first_id, last_id in chunks
+    ]
+    body = promotion_prices_finalize.s(obj_id, lock_token).on_error(
+        promotion_prices_failed.s(obj_id, lock_token)
+    )
+    result = chord(header)(body)
+    if result.parent is None:
+        # eager mode, the chord has already run
+        return result.id
+    result.parent.save()
+    return result.parent.id
 
 
 @shared_task()
 def promotion_management():
-    with transaction.atomic():
-        promotion = Promotion.objects.filter(is_schedule=True)
-        now = datetime.now().date()
-
-        for promo in promotion:
-            if promo.promo_end < now:
-                promo.is_active = False
-                promo.is_schedule = False
-            elif promo.promo_start <= now:
-                promo.is_active = True
-            else:
-                promo.is_active = False
-            promo.save()
+    return sweep_promotions()
+
+
+@shared_task()
+def promotion_status(obj_id):
+    return sweep_promotions(promotion_ids=[obj_id])
+
+
+@shared_task()
+def promotion_schedule():
+    return len(schedule_promotions())
+
+
+@shared_task(bind=True, max_retries=None)
+def promotion_reprice(self, obj_id, token):
+    """
+    Reprice and sweep one promotion, queued by request_promotion_reprice.
+    Tasks superseded by a newer token exit without doing anything
+    """
+    if cache.get(REPRICE_TOKEN_KEY.format(obj_id)) != token:
+        return None
+
+    lock_key = REPRICE_LOCK_KEY.format(obj_id)
+    if not cache.add(lock_key, token, timeout=settings.PROMOTION_REPRICE_LOCK_TIMEOUT):
+        raise self.retry(countdown=settings.PROMOTION_REPRICE_DEBOUNCE)
+
+    fanned_out = False
+    try:
+        promotion = Promotion.objects.filter(id=obj_id).first()
+        if promotion is None:
+            return None
+
+        sweep_promotions(promotion_ids=[obj_id])
+        schedule_promotion(promotion)
+
+        chunks = get_chunk_ranges(obj_id, settings.PROMOTION_PRICES_CHUNK_SIZE)
+        if len(chunks) > 1:
+            # the chord releases the lock once every chunk has run
+            result = promotion_prices_fanout.delay(
+                promotion.promo_reduction, obj_id, lock_token=token
+            )
+            fanned_out = True
+            return result.id
+        return promotion_prices(promotion.promo_reduction, obj_id)
+    finally:
+        if not fanned_out:
+            cache.delete(lock_key)
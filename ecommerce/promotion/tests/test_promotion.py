@@ -1,4 +1,11 @@
-from ecommerce.promotion.models import Promotion
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+
+from ecommerce.promotion.models import PriceTimeline, ProductsOnPromotion, Promotion
+from ecommerce.promotion.pricing import get_promotion_prices
 
 
 def test_single_promotion(db, promotion_multi_variant):
@@ -6,3 +13,60 @@ def test_single_promotion(db, promotion_multi_variant):
     get_promotion = Promotion.objects.all().first()
     assert new_promotion.id == get_promotion.id
     assert new_promotion.coupon.coupon_code == get_promotion.coupon.coupon_code
+
+
+def test_promotion_prices_pick_lowest_active_promotion(
+    db, promotion_multi_variant, single_promotion_type
+):
+    inventory = promotion_multi_variant.products_on_promotion.first()
+    second_promotion = Promotion.objects.create(
+        name="Second",
+        is_active=True,
+        promo_type=single_promotion_type,
+        promo_start=promotion_multi_variant.promo_start,
+        promo_end=promotion_multi_variant.promo_end,
+    )
+    second_promotion.products_on_promotion.add(
+        inventory, through_defaults={"promo_price": "80.00"}
+    )
+
+    assert get_promotion_prices([inventory.id]) == {inventory.id: Decimal("80.00")}
+
+    second_promotion.is_active = False
+    second_promotion.save()
+    assert get_promotion_prices([inventory.id]) == {inventory.id: Decimal("100.00")}
+
+
+def test_promotion_prices_preview_scheduled_promotion(db, promotion_multi_variant):
+    inventory = promotion_multi_variant.products_on_promotion.first()
+    promotion_multi_variant.promo_start = date.today() + timedelta(1)
+    promotion_multi_variant.save()
+
+    assert get_promotion_prices([inventory.id]) == {}
+    assert get_promotion_prices([inventory.id], at=date.today() + timedelta(1)) == {
+        inventory.id: Decimal("100.00")
+    }
+    assert get_promotion_prices([inventory.id], at=date.today() + timedelta(6)) == {}
+
+
+def test_price_timeline_follows_products_on_promotion(db, promotion_multi_variant):
+    inventory = promotion_multi_variant.products_on_promotion.first()
+    product_on_promotion = ProductsOnPromotion.objects.get()
+
+    product_on_promotion.promo_price = "90.00"
+    product_on_promotion.price_override = True
+    product_on_promotion.save()
+    assert get_promotion_prices([inventory.id]) == {inventory.id: Decimal("90.00")}
+
+    product_on_promotion.delete()
+    assert get_promotion_prices([inventory.id]) == {}
+
+
+def test_rebuild_timeline_command(db, promotion_multi_variant):
+    inventory = promotion_multi_variant.products_on_promotion.first()
+    PriceTimeline.objects.all().delete()
+    Promotion.objects.filter(id=promotion_multi_variant.id).update(is_active=True)
+
+    call_command("promotion-rebuild-timeline", stdout=io.StringIO())
+
+    assert get_promotion_prices([inventory.id]) == {inventory.id: Decimal("100.00")}
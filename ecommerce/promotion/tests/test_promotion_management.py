@@ -1,9 +1,27 @@
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
 
 import pytest
+from celery.exceptions import Retry
+from django.core.cache import cache
 
+from ecommerce.inventory.models import ProductInventory
 from ecommerce.promotion.models import Promotion
-from ecommerce.promotion.tasks import promotion_prices, promotion_management
+from ecommerce.promotion.scheduling import (
+    REPRICE_LOCK_KEY,
+    request_promotion_reprice,
+    schedule_promotion,
+    schedule_promotions,
+)
+from ecommerce.promotion.signals import promotion_prices_changed
+from ecommerce.promotion.tasks import (
+    promotion_management,
+    promotion_prices,
+    promotion_prices_fanout,
+    promotion_prices_finalize,
+    promotion_reprice,
+    promotion_status,
+)
 
 
 @pytest.mark.parametrize(
@@ -46,3 +64,189 @@ def test_promotion_price_reduction(
         promotion_id=promotion_multi_variant.id
     )
     assert new_price.promo_price == result
+
+
+def test_promotion_price_reduction_skips_override(promotion_multi_variant):
+    promotion_multi_variant.product_promotion.update(price_override=True)
+    assert promotion_prices(10, promotion_multi_variant.id) == 0
+
+    promotion_multi_variant.product_promotion.update(price_override=False)
+    assert promotion_prices(30, promotion_multi_variant.id) == 1
+    assert promotion_prices(30, promotion_multi_variant.id) == 0
+    assert promotion_multi_variant.product_promotion.get().promo_price == 70
+
+
+def test_promotion_price_fanout(
+    monkeypatch, single_sub_product_with_media_and_attributes, promotion_multi_variant
+):
+    product = single_sub_product_with_media_and_attributes["inventory"]
+    for i in range(4):
+        variant = ProductInventory.objects.get(pk=product.pk)
+        variant.pk = None
+        variant.sku = variant.upc = f"variant_{i}"
+        variant.save()
+        promotion_multi_variant.products_on_promotion.add(variant)
+
+    received = []
+    promotion_prices_changed.connect(
+        lambda sender, **kwargs: received.append(kwargs), weak=False
+    )
+    monkeypatch.setattr(promotion_prices_fanout.app.conf, "task_always_eager", True)
+    promotion_prices_fanout(10, promotion_multi_variant.id, chunk_size=2)
+
+    assert received[-1]["changed"] == 5
+    assert not Promotion.objects.get(id=promotion_multi_variant.id).is_pricing
+    assert set(
+        promotion_multi_variant.product_promotion.values_list("promo_price", flat=True)
+    ) == {90}
+
+
+def test_promotion_price_fanout_failure(monkeypatch, promotion_multi_variant):
+    def fail(*args, **kwargs):
+        raise RuntimeError("chunk failed")
+
+    def broker_chord(header):
+        # eager chords raise instead of calling the body's error callbacks
+        def apply(body):
+            try:
+                [task() for task in header]
+            except RuntimeError as exc:
+                for errback in body.options["link_error"]:
+                    errback.clone(args=(SimpleNamespace(id="chunk"), exc, None))()
+            return SimpleNamespace(id="chord", parent=None)
+
+        return apply
+
+    received = []
+    promotion_prices_changed.connect(
+        lambda sender, **kwargs: received.append(kwargs), weak=False
+    )
+    monkeypatch.setattr("ecommerce.promotion.tasks.reprice_promotion", fail)
+    monkeypatch.setattr("ecommerce.promotion.tasks.chord", broker_chord)
+    lock_key = REPRICE_LOCK_KEY.format(promotion_multi_variant.id)
+    cache.add(lock_key, "token")
+    promotion_prices_fanout(
+        10, promotion_multi_variant.id, chunk_size=1, lock_token="token"
+    )
+
+    assert not Promotion.objects.get(id=promotion_multi_variant.id).is_pricing
+    assert cache.get(lock_key) is None
+    assert received[-1]["promotion_id"] == promotion_multi_variant.id
+    assert received[-1]["changed"] is None
+
+
+def test_promotion_management_reports_changes(promotion_multi_variant):
+    assert promotion_management() == {
+        "activated": [promotion_multi_variant.id],
+        "deactivated": [],
+    }
+    assert promotion_management() == {"activated": [], "deactivated": []}
+
+    promotion_multi_variant.promo_start = date.today() + timedelta(1)
+    promotion_multi_variant.save(update_fields=["promo_start"])
+    assert promotion_management() == {
+        "activated": [],
+        "deactivated": [promotion_multi_variant.id],
+    }
+
+
+def test_schedule_promotion(monkeypatch, settings, promotion_multi_variant):
+    settings.PROMOTION_STATUS_ETA_HORIZON = 7 * 24 * 3600
+    scheduled = []
+    monkeypatch.setattr(
+        promotion_status, "apply_async", lambda args, eta: scheduled.append(eta)
+    )
+    promotion_multi_variant.promo_start = date.today() + timedelta(1)
+
+    schedule_promotion(promotion_multi_variant)
+
+    assert scheduled == [
+        datetime.combine(date.today() + timedelta(1), time.min),
+        datetime.combine(date.today() + timedelta(6), time.min),
+    ]
+
+
+def test_schedule_promotion_leaves_far_boundaries(
+    monkeypatch, settings, promotion_multi_variant
+):
+    settings.PROMOTION_STATUS_ETA_HORIZON = 2 * 24 * 3600
+    scheduled = []
+    monkeypatch.setattr(
+        promotion_status, "apply_async", lambda args, eta: scheduled.append(eta)
+    )
+    promotion_multi_variant.promo_start = date.today() + timedelta(1)
+    promotion_multi_variant.promo_end = date.today() + timedelta(5)
+    promotion_multi_variant.is_schedule = True
+    promotion_multi_variant.save()
+    Promotion.objects.create(
+        name="later",
+        promo_reduction=10,
+        is_active=False,
+        is_schedule=True,
+        promo_start=date.today() + timedelta(10),
+        promo_end=date.today() + timedelta(20),
+        promo_type=promotion_multi_variant.promo_type,
+        coupon=promotion_multi_variant.coupon,
+    )
+
+    schedule_promotions()
+
+    assert scheduled == [datetime.combine(date.today() + timedelta(1), time.min)]
+
+
+def test_promotion_reprice_latest_wins(monkeypatch, promotion_multi_variant):
+    monkeypatch.setattr(promotion_reprice, "apply_async", lambda args, countdown: None)
+    monkeypatch.setattr(promotion_status, "apply_async", lambda args, eta: None)
+    promotion_multi_variant.promo_reduction = 10
+    promotion_multi_variant.save()
+
+    stale_token = request_promotion_reprice(promotion_multi_variant.id)
+    latest_token = request_promotion_reprice(promotion_multi_variant.id)
+
+    assert promotion_reprice(promotion_multi_variant.id, stale_token) is None
+    assert promotion_multi_variant.product_promotion.get().promo_price == 100
+
+    assert promotion_reprice(promotion_multi_variant.id, latest_token) == 1
+    assert promotion_multi_variant.product_promotion.get().promo_price == 90
+    assert Promotion.objects.get(id=promotion_multi_variant.id).is_active
+
+
+def test_promotion_reprice_waits_for_lock(monkeypatch, promotion_multi_variant):
+    monkeypatch.setattr(promotion_reprice, "apply_async", lambda args, countdown: None)
+    token = request_promotion_reprice(promotion_multi_variant.id)
+    cache.add(REPRICE_LOCK_KEY.format(promotion_multi_variant.id), "other")
+
+    with pytest.raises(Retry):
+        promotion_reprice(promotion_multi_variant.id, token)
+    cache.delete(REPRICE_LOCK_KEY.format(promotion_multi_variant.id))
+
+
+def test_promotion_reprice_holds_lock_until_fanout_finishes(
+    monkeypatch,
+    settings,
+    single_sub_product_with_media_and_attributes,
+    promotion_multi_variant,
+):
+    settings.PROMOTION_PRICES_CHUNK_SIZE = 1
+    product = single_sub_product_with_media_and_attributes["inventory"]
+    variant = ProductInventory.objects.get(pk=product.pk)
+    variant.pk = None
+    variant.sku = variant.upc = "variant"
+    variant.save()
+    promotion_multi_variant.products_on_promotion.add(variant)
+    queued = []
+    monkeypatch.setattr(promotion_reprice, "apply_async", lambda args, countdown: None)
+    monkeypatch.setattr(promotion_status, "apply_async", lambda args, eta: None)
+    monkeypatch.setattr(
+        promotion_prices_fanout,
+        "delay",
+        lambda *args, **kwargs: queued.append(kwargs) or SimpleNamespace(id="chord"),
+    )
+    token = request_promotion_reprice(promotion_multi_variant.id)
+    lock_key = REPRICE_LOCK_KEY.format(promotion_multi_variant.id)
+
+    assert promotion_reprice(promotion_multi_variant.id, token) == "chord"
+    assert cache.get(lock_key) == token
+
+    promotion_prices_finalize([2], promotion_multi_variant.id, queued[0]["lock_token"])
+    assert cache.get(lock_key) is None
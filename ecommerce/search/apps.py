@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class SearchConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ecommerce.search"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .backends import create_trigram_index
+
+        post_migrate.connect(create_trigram_index, sender=self)
@@ -0,0 +1,405 @@
+import logging
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Count, Q
+from django.utils.module_loading import import_string
+from elasticsearch_dsl import Q as ESQ
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+
+from ecommerce.inventory.models import (
+    Brand,
+    Category,
+    Product,
+    ProductAttributeValue,
+    ProductInventory,
+)
+
+from .client import CircuitOpenError, elasticsearch_breaker, get_client
+from .documents import ProductInventoryDocument
+from .pagination import SearchAfterPagination, SearchLimitOffsetPagination
+
+logger = logging.getLogger(__name__)
+
+# single token with at least one digit: sku, upc or product web_id
+IDENTIFIER_RE = re.compile(r"^(?=.*\d)[\w-]{4,50}$")
+
+SEARCH_CONFIG = "english"
+
+
+@lru_cache(maxsize=None)
+def get_backend(path):
+    return import_string(path)()
+
+
+def search(request, query):
+    """
+    Run the query on SEARCH_BACKEND, SEARCH_FALLBACK_BACKEND answers when it
+    fails or its circuit breaker is open. Fallback responses are flagged
+    with response.degraded
+    """
+    backend = get_backend(settings.SEARCH_BACKEND)
+    if not settings.SEARCH_FALLBACK_BACKEND:
+        return backend.search(request, query)
+
+    try:
+        return backend.search(request, query)
+    except APIException:
+        raise
+    except CircuitOpenError:
+        pass
+    except Exception:
+        logger.exception("%s failed, falling back", settings.SEARCH_BACKEND)
+
+    response = get_backend(settings.SEARCH_FALLBACK_BACKEND).search(request, query)
+    response.degraded = True
+    return response
+
+
+class BaseSearchBackend:
+    """
+    Search ProductInventory cards: search(request, query) returns the
+    paginated Response of product cards with the facets of the filtered results
+    """
+
+    facet_size = 20
+    price_ranges = [
+        {"to": 25},
+        {"from": 25, "to": 50},
+        {"from": 50, "to": 100},
+        {"from": 100, "to": 250},
+        {"from": 250},
+    ]
+
+    def search(self, request, query):
+        raise NotImplementedError
+
+    def get_price_range(self, params):
+        price_range = {}
+        for param, op in (("price_min", "gte"), ("price_max", "lte")):
+            if value := params.get(param):
+                try:
+                    price_range[op] = float(value)
+                except ValueError:
+                    raise ValidationError({param: "A valid number is required."})
+        return price_range
+
+
+class ElasticsearchBackend(BaseSearchBackend):
+    """
+    Cards rendered from _source, facets from aggregations. Requests go
+    through the "search" client options and the Elasticsearch circuit breaker
+    """
+
+    search_document = ProductInventoryDocument
+    pagination_class = SearchLimitOffsetPagination
+    cursor_pagination_class = SearchAfterPagination
+
+    def search(self, request, query):
+        return elasticsearch_breaker.call(self.run_search, request, query)
+
+    def run_search(self, request, query):
+        if self.cursor_pagination_class.cursor_query_param in request.query_params:
+            paginator = self.cursor_pagination_class()
+        else:
+            paginator = self.pagination_class()
+
+        # codes pasted by ops staff hit the keyword subfields first,
+        # full-text only runs when no identifier matched
+        result = None
+        if IDENTIFIER_RE.match(query):
+            search = self.build_search(request, self.get_identifier_query(query))
+            result = paginator.paginate_search(search, request)
+            if not paginator.count:
+                result = None
+        if result is None:
+            search = self.build_search(request, self.get_text_query(query))
+            result = paginator.paginate_search(search, request)
+
+        doc = self.search_document()
+        response = paginator.get_paginated_response(
+            [doc.get_card(hit.to_dict()) for hit in result]
+        )
+        response.data["facets"] = self.get_facets(paginator.response)
+        return response
+
+    def get_identifier_query(self, query):
+        return ESQ(
+            "constant_score",
+            filter=ESQ(
+                "bool",
+                should=[
+                    ESQ("term", **{"sku.raw": query}),
+                    ESQ("term", upc=query),
+                    ESQ("term", **{"product.web_id.raw": query}),
+                ],
+            ),
+        )
+
+    def get_text_query(self, query):
+        return ESQ(
+            "multi_match",
+            query=query,
+            fields=["product.name", "product.web_id", "brand.name"],
+            fuzziness="auto",
+        ) & ESQ(
+            should=[
+                ESQ("match", is_default=True),
+            ],
+            minimum_should_match=1,
+        )
+
+    def build_search(self, request, q):
+        search = (
+            self.search_document.search(using=get_client("search"))
+            .query(q)
+            .source(self.search_document.card_fields)
+        )
+        search = self.filter_search(search, request)
+        return self.aggregate_search(search)
+
+    def filter_search(self, search, request):
+        """
+        Filters run in filter context: cached by Elasticsearch, no scoring
+        """
+        params = request.query_params
+        if brands := params.getlist("brand"):
+            search = search.filter("terms", **{"brand.name.raw": brands})
+        if category := params.get("category"):
+            search = search.filter("term", **{"category.path": category})
+        for attribute in params.getlist("attribute"):
+            search = search.filter("term", attributes=attribute)
+        if price_range := self.get_price_range(params):
+            search = search.filter("range", store_price=price_range)
+        return search
+
+    def aggregate_search(self, search):
+        search.aggs.bucket(
+            "brand", "terms", field="brand.name.raw", size=self.facet_size
+        )
+        search.aggs.bucket(
+            "category", "terms", field="category.slug", size=self.facet_size
+        )
+        search.aggs.bucket(
+            "attributes", "terms", field="attributes", size=self.facet_size * 5
+        )
+        search.aggs.bucket(
+            "price", "range", field="store_price", ranges=self.price_ranges
+        )
+        return search
+
+    def get_facets(self, response):
+        aggs = response.aggregations
+        facets = {
+            name: [
+                {"value": bucket.key, "count": bucket.doc_count}
+                for bucket in aggs[name].buckets
+            ]
+            for name in ("brand", "category")
+        }
+
+        attributes = {}
+        for bucket in aggs.attributes.buckets:
+            name, _, value = bucket.key.partition(":")
+            attributes.setdefault(name, []).append(
+                {"value": value, "count": bucket.doc_count}
+            )
+        facets["attributes"] = attributes
+
+        facets["price"] = [
+            {
+                "from": bucket.to_dict().get("from"),
+                "to": bucket.to_dict().get("to"),
+                "count": bucket.doc_count,
+            }
+            for bucket in aggs.price.buckets
+        ]
+        return facets
+
+
+@lru_cache(maxsize=None)
+def has_trigram(using="default"):
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trigram_index(using="default", **kwargs):
+    """
+    post_migrate handler: enable pg_trgm and index product names for
+    trigram similarity, skipped where the extension is not available
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS product_name_trgm_idx "
+                f"ON {Product._meta.db_table} USING gin (name gin_trgm_ops)"
+            )
+    except DatabaseError:
+        logger.warning("pg_trgm is not available, trigram search is disabled")
+    has_trigram.cache_clear()
+
+
+class PostgresBackend(BaseSearchBackend):
+    """
+    Full-text search on product name and web_id through the
+    product_search_vector_idx GIN index, trigram similarity on product name
+    for typos when pg_trgm is installed. Cards are prepared by
+    ProductInventoryDocument so they match the Elasticsearch ones,
+    facets are counted with GROUP BY. Pages with limit/offset only
+    """
+
+    search_document = ProductInventoryDocument
+    pagination_class = LimitOffsetPagination
+
+    def search(self, request, query):
+        queryset = self.filter_queryset(self.get_queryset(query), request)
+        paginator = self.pagination_class()
+        paginator.max_limit = 100
+        page = paginator.paginate_queryset(queryset, request)
+
+        doc = self.search_document()
+        response = paginator.get_paginated_response(
+            [doc.prepare_card(instance) for instance in page]
+        )
+        response.data["facets"] = self.get_facets(queryset)
+        return response
+
+    def get_queryset(self, query):
+        queryset = self.search_document().get_queryset()
+
+        if IDENTIFIER_RE.match(query):
+            exact = queryset.filter(
+                Q(sku=query) | Q(upc=query) | Q(product__web_id=query)
+            ).order_by("id")
+            if exact.exists():
+                return exact
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        products = Product.objects.annotate(
+            search=SearchVector("name", "web_id", config=SEARCH_CONFIG)
+        ).filter(search=search_query)
+        brands = Brand.objects.annotate(
+            search=SearchVector("name", config=SEARCH_CONFIG)
+        ).filter(search=search_query)
+        match = Q(product__in=products.values("id")) | Q(brand__in=brands.values("id"))
+        rank = SearchRank(
+            SearchVector("product__name", "product__web_id", config=SEARCH_CONFIG),
+            search_query,
+        )
+
+        if has_trigram(connection.alias):
+            match |= Q(
+                product__in=Product.objects.filter(name__trigram_similar=query).values(
+                    "id"
+                )
+            )
+            rank = rank + TrigramSimilarity("product__name", query)
+
+        return (
+            queryset.filter(match, is_default=True)
+            .annotate(rank=rank)
+            .order_by("-rank", "id")
+        )
+
+    def filter_queryset(self, queryset, request):
+        params = request.query_params
+        if brands := params.getlist("brand"):
+            queryset = queryset.filter(brand__name__in=brands)
+        if category := params.get("category"):
+            queryset = queryset.filter(
+                product__category__in=Category.objects.filter(
+                    slug=category
+                ).get_descendants(include_self=True)
+            )
+        for attribute in params.getlist("attribute"):
+            name, _, value = attribute.partition(":")
+            queryset = queryset.filter(
+                attribute_values__in=ProductAttributeValue.objects.filter(
+                    product_attribute__name=name, attribute_value=value
+                )
+            )
+        price_range = self.get_price_range(params)
+        if "gte" in price_range:
+            queryset = queryset.filter(store_price__gte=price_range["gte"])
+        if "lte" in price_range:
+            queryset = queryset.filter(store_price__lte=price_range["lte"])
+        return queryset
+
+    def get_facets(self, queryset):
+        results = ProductInventory.objects.filter(
+            id__in=queryset.order_by().values("id")
+        )
+        facets = {}
+        for name, field in (
+            ("brand", "brand__name"),
+            ("category", "product__category__slug"),
+        ):
+            rows = (
+                results.exclude(**{f"{field}__isnull": True})
+                .values(field)
+                .annotate(count=Count("id"))
+                .order_by("-count", field)[: self.facet_size]
+            )
+            facets[name] = [
+                {"value": row[field], "count": row["count"]} for row in rows
+            ]
+
+        attributes = {}
+        rows = (
+            results.filter(attribute_values__isnull=False)
+            .values(
+                "attribute_values__product_attribute__name",
+                "attribute_values__attribute_value",
+            )
+            .annotate(count=Count("id"))
+            .order_by("-count")[: self.facet_size * 5]
+        )
+        for row in rows:
+            attributes.setdefault(
+                row["attribute_values__product_attribute__name"], []
+            ).append(
+                {
+                    "value": row["attribute_values__attribute_value"],
+                    "count": row["count"],
+                }
+            )
+        facets["attributes"] = attributes
+
+        counts = results.aggregate(
+            **{
+                str(i): Count(
+                    "id",
+                    filter=Q(
+                        **{
+                            f"store_price__{op}": price_range[key]
+                            for key, op in (("from", "gte"), ("to", "lt"))
+                            if key in price_range
+                        }
+                    ),
+                )
+                for i, price_range in enumerate(self.price_ranges)
+            }
+        )
+        facets["price"] = [
+            {
+                "from": price_range.get("from"),
+                "to": price_range.get("to"),
+                "count": counts[str(i)],
+            }
+            for i, price_range in enumerate(self.price_ranges)
+        ]
+        return facets
@@ -0,0 +1,60 @@
+import json
+import time
+from hashlib import md5
+
+from django.core.cache import cache
+
+GENERATION_KEY = "search:results:generation"
+RESULT_KEY = "search:results:{}:{}"
+HITS_KEY = "search:results:hits"
+MISSES_KEY = "search:results:misses"
+
+
+def get_generation():
+    """
+    Current index generation, every cached result page belongs to one.
+    Starts from the clock so an evicted counter never reuses old generations
+    """
+    return cache.get_or_set(GENERATION_KEY, int(time.time()), None)
+
+
+def bump_generation():
+    """
+    Invalidate every cached result page at once
+    """
+    get_generation()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # evicted in between
+        return get_generation()
+
+
+def get_result_key(host, query, params):
+    """
+    Cache key of a result page: normalized query, filters and page params
+    """
+    normalized = {
+        "host": host,
+        "query": " ".join(query.split()),
+        "params": sorted((key, sorted(values)) for key, values in params.lists()),
+    }
+    digest = md5(json.dumps(normalized).encode()).hexdigest()
+    return RESULT_KEY.format(get_generation(), digest)
+
+
+def record(hit):
+    key = HITS_KEY if hit else MISSES_KEY
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def get_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        "generation": get_generation(),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
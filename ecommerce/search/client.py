@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from elastic_transport import ConnectionError, ConnectionTimeout
+from elasticsearch import ApiError
+from elasticsearch_dsl.connections import connections
+
+
+class CircuitOpenError(Exception):
+    """
+    Elasticsearch is considered unhealthy, requests fail fast
+    """
+
+
+def get_client(endpoint):
+    """
+    Client for an endpoint class ("search", "suggest") with its timeout and
+    retries from SEARCH_CLIENT_OPTIONS. It shares the connection pool of the
+    default connection, which indexing uses as configured in ELASTICSEARCH_DSL
+    """
+    return connections.get_connection().options(
+        **settings.SEARCH_CLIENT_OPTIONS[endpoint]
+    )
+
+
+def is_unhealthy(exc):
+    if isinstance(exc, (ConnectionError, ConnectionTimeout)):
+        return True
+    return isinstance(exc, ApiError) and exc.meta.status >= 500
+
+
+class CircuitBreaker:
+    """
+    Cache-backed circuit breaker shared by every web worker.
+    SEARCH_BREAKER_FAILURES failures within SEARCH_BREAKER_WINDOW seconds open
+    it for SEARCH_BREAKER_RESET_TIMEOUT seconds, successes in between do not
+    reset the count. Then it is half-open: the next failure opens it again
+    right away, a success closes it. Calls slower than SEARCH_SLOW_THRESHOLD
+    seconds count as failures
+    """
+
+    def __init__(self, name):
+        self.open_key = f"search:breaker:{name}:open"
+        self.failures_key = f"search:breaker:{name}:failures"
+        self.tripped_key = f"search:breaker:{name}:tripped"
+
+    @property
+    def is_open(self):
+        return bool(cache.get(self.open_key))
+
+    def call(self, func, *args, **kwargs):
+        # one round trip for the state of healthy calls
+        state = cache.get_many([self.open_key, self.tripped_key])
+        if state.get(self.open_key):
+            raise CircuitOpenError(self.open_key)
+
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_unhealthy(e):
+                self.failure()
+            raise
+
+        if time.perf_counter() - started > settings.SEARCH_SLOW_THRESHOLD:
+            self.failure()
+        elif state.get(self.tripped_key):
+            self.success()
+        return result
+
+    def success(self):
+        """
+        Close the breaker after a successful half-open call, failures of
+        healthy calls expire with the window
+        """
+        cache.delete_many([self.failures_key, self.tripped_key])
+
+    def failure(self):
+        if cache.add(self.failures_key, 1, settings.SEARCH_BREAKER_WINDOW):
+            failures = 1
+        else:
+            try:
+                failures = cache.incr(self.failures_key)
+            except ValueError:
+                failures = 1
+        if failures >= settings.SEARCH_BREAKER_FAILURES or cache.get(self.tripped_key):
+            self.trip()
+
+    def reset(self):
+        cache.delete_many([self.open_key, self.failures_key, self.tripped_key])
+
+    def trip(self):
+        cache.set(self.open_key, True, settings.SEARCH_BREAKER_RESET_TIMEOUT)
+        cache.set(self.tripped_key, True, settings.SEARCH_BREAKER_RESET_TIMEOUT * 10)
+        cache.delete(self.failures_key)
+
+
+elasticsearch_breaker = CircuitBreaker("elasticsearch")
@@ -1,15 +1,72 @@
+from datetime import datetime
+
+from django.db.models import Prefetch
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from ecommerce.inventory.models import ProductInventory
+from elasticsearch_dsl.serializer import serializer
+from rest_framework import serializers
+
+from ecommerce.inventory.models import (
+    Brand,
+    Category,
+    Media,
+    Product,
+    ProductAttributeValue,
+    ProductInventory,
+    Stock,
+)
+from ecommerce.promotion.models import PriceTimeline
 
 
 @registry.register_document
 class ProductInventoryDocument(Document):
+    """
+    Product card of a sub product, complete enough to render search results
+    from _source without touching the database
+    """
 
+    sku = fields.TextField(fields={"raw": fields.KeywordField()})
+    upc = fields.KeywordField()
     product = fields.ObjectField(
-        properties={"name": fields.TextField(), "web_id": fields.TextField()}
+        properties={
+            "name": fields.TextField(),
+            "web_id": fields.TextField(fields={"raw": fields.KeywordField()}),
+        }
+    )
+    brand = fields.ObjectField(
+        properties={"name": fields.TextField(fields={"raw": fields.KeywordField()})}
     )
-    brand = fields.ObjectField(properties={"name": fields.TextField()})
+    category = fields.ObjectField(
+        properties={
+            "name": fields.TextField(),
+            "slug": fields.KeywordField(),
+            "path": fields.KeywordField(multi=True),
+        }
+    )
+    image_url = fields.KeywordField(index=False)
+    promotion_price = fields.DoubleField()
+    in_stock = fields.BooleanField()
+    # "name:value" pairs, one keyword per attribute value for filters and facets
+    attributes = fields.KeywordField(multi=True)
+    suggest = fields.CompletionField()
+
+    # fields returned to clients, everything else is only searched on
+    card_fields = [
+        "id",
+        "sku",
+        "store_price",
+        "is_default",
+        "product",
+        "brand",
+        "category.name",
+        "category.path",
+        "image_url",
+        "promotion_price",
+        "in_stock",
+    ]
+    # card prices are rendered as the DRF serializers render prices
+    price_fields = ["store_price", "promotion_price"]
+    price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
 
     class Index:
         name = "productinventory"
@@ -19,7 +76,138 @@ class ProductInventoryDocument(Document):
 
         fields = [
             "id",
-            "sku",
             "store_price",
             "is_active",
+            "is_default",
+        ]
+        related_models = [
+            Product,
+            Brand,
+            Category,
+            Media,
+            Stock,
+            ProductAttributeValue,
+        ]
+        queryset_pagination = 1000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._category_paths = {}
+
+    def prepare_card(self, instance):
+        """
+        Card of instance as search hits return it from _source
+        """
+        # serialized the way documents are sent to Elasticsearch
+        return self.get_card(serializer.loads(serializer.dumps(self.prepare(instance))))
+
+    def get_card(self, data):
+        """
+        Card of a document _source, prices as decimal strings
+        """
+        card = {}
+        for field in self.card_fields:
+            name, _, sub = field.partition(".")
+            if name not in data:
+                continue
+            if sub:
+                if sub in data[name]:
+                    card.setdefault(name, {})[sub] = data[name][sub]
+            else:
+                card[name] = data[name]
+        for name in self.price_fields:
+            if card.get(name) is not None:
+                card[name] = self.price_field.to_representation(card[name])
+        return card
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("product__category", "brand", "stock")
+            .prefetch_related(
+                Prefetch(
+                    "media",
+                    queryset=Media.objects.order_by("-is_feature", "id"),
+                    to_attr="ordered_media",
+                ),
+                Prefetch(
+                    "price_timeline",
+                    queryset=PriceTimeline.objects.filter(
+                        valid_from__lte=datetime.now().date(),
+                        valid_to__gte=datetime.now().date(),
+                    ).order_by("effective_price", "promotion_id"),
+                    to_attr="current_prices",
+                ),
+                Prefetch(
+                    "attribute_values",
+                    queryset=ProductAttributeValue.objects.select_related(
+                        "product_attribute"
+                    ),
+                ),
+            )
+        )
+
+    def get_instances_from_related(self, related_instance):
+        if isinstance(related_instance, (Product, Brand)):
+            return related_instance.product_inventory.all()
+        if isinstance(related_instance, ProductAttributeValue):
+            return related_instance.productinventory.all()
+        if isinstance(related_instance, Category):
+            return ProductInventory.objects.filter(
+                product__category__in=related_instance.get_descendants(
+                    include_self=True
+                )
+            )
+        if isinstance(related_instance, (Media, Stock)):
+            return related_instance.product_inventory
+
+    def prepare_category(self, instance):
+        category = instance.product.category
+        if category is None:
+            return {}
+        if category.id not in self._category_paths:
+            self._category_paths[category.id] = [
+                ancestor.slug for ancestor in category.get_ancestors(include_self=True)
+            ]
+        return {
+            "name": category.name,
+            "slug": category.slug,
+            "path": self._category_paths[category.id],
+        }
+
+    def prepare_image_url(self, instance):
+        media = getattr(instance, "ordered_media", None)
+        if media is None:
+            media = instance.media.order_by("-is_feature", "id")
+        return media[0].img_url.url if media else None
+
+    def prepare_promotion_price(self, instance):
+        prices = getattr(instance, "current_prices", None)
+        if prices is None:
+            prices = instance.price_timeline.filter(
+                valid_from__lte=datetime.now().date(),
+                valid_to__gte=datetime.now().date(),
+            ).order_by("effective_price", "promotion_id")
+        return prices[0].effective_price if prices else None
+
+    def prepare_suggest(self, instance):
+        # one suggestion per product, none for products that are not on sale
+        if not (
+            instance.is_active and instance.is_default and instance.product.is_active
+        ):
+            return None
+        inputs = [instance.product.name, instance.sku]
+        if instance.brand is not None:
+            inputs.append(instance.brand.name)
+        return {"input": inputs}
+
+    def prepare_in_stock(self, instance):
+        stock = getattr(instance, "stock", None)
+        return stock is not None and stock.units > 0
+
+    def prepare_attributes(self, instance):
+        return [
+            f"{value.product_attribute.name}:{value.attribute_value}"
+            for value in instance.attribute_values.all()
         ]
@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+from django_elasticsearch_dsl.registries import registry
+
+DIRTY_KEY = "search:index:dirty:{}"
+DELETED_KEY = "search:index:deleted:{}"
+FLUSH_SCHEDULED_KEY = "search:index:flush-scheduled"
+# set while search-reindex builds a new index, ids flushed into the old one
+# meanwhile are recorded to be replayed into the new one
+REBUILD_KEY = "search:index:rebuild"
+REBUILD_CHANGED_KEY = "search:index:rebuild:changed:{}"
+REBUILD_TIMEOUT = 24 * 60 * 60
+
+
+@lru_cache(maxsize=None)
+def get_queue():
+    return redis.Redis.from_url(settings.SEARCH_INDEX_QUEUE_URL)
+
+
+def get_model_label(model):
+    return model._meta.label_lower
+
+
+def enqueue_update(model, ids, flush=True):
+    """
+    Mark model ids as dirty, they are reindexed by the next flush,
+    scheduled here unless flush is False
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    label = get_model_label(model)
+    pipe = get_queue().pipeline()
+    pipe.sadd(DIRTY_KEY.format(label), *ids)
+    pipe.srem(DELETED_KEY.format(label), *ids)
+    pipe.scard(DIRTY_KEY.format(label))
+    pending = pipe.execute()[-1]
+    if flush:
+        schedule_flush(pending)
+
+
+def enqueue_delete(model, ids, flush=True):
+    """
+    Mark model ids as deleted, they are removed from the index by the next
+    flush, scheduled here unless flush is False
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    label = get_model_label(model)
+    pipe = get_queue().pipeline()
+    pipe.sadd(DELETED_KEY.format(label), *ids)
+    pipe.srem(DIRTY_KEY.format(label), *ids)
+    pipe.execute()
+    if flush:
+        schedule_flush(0)
+
+
+def schedule_flush(pending):
+    """
+    Flush right away once a batch is full, otherwise at most
+    SEARCH_INDEX_FLUSH_INTERVAL seconds after the first dirty id
+    """
+    from .tasks import flush_search_index
+
+    if pending >= settings.SEARCH_INDEX_BATCH_SIZE:
+        flush_search_index.delay()
+    elif get_queue().set(
+        FLUSH_SCHEDULED_KEY, 1, nx=True, ex=settings.SEARCH_INDEX_FLUSH_INTERVAL
+    ):
+        flush_search_index.apply_async(countdown=settings.SEARCH_INDEX_FLUSH_INTERVAL)
+
+
+def pop_dirty(model, count):
+    return _pop(DIRTY_KEY.format(get_model_label(model)), count)
+
+
+def pop_deleted(model, count):
+    return _pop(DELETED_KEY.format(get_model_label(model)), count)
+
+
+def _pop(key, count):
+    return [int(id) for id in get_queue().spop(key, count) or []]
+
+
+def start_rebuild():
+    """
+    Start recording the ids flushed until finish_rebuild
+    """
+    pipe = get_queue().pipeline()
+    pipe.delete(*(REBUILD_CHANGED_KEY.format(label) for label in get_labels()))
+    pipe.set(REBUILD_KEY, 1, ex=REBUILD_TIMEOUT)
+    pipe.execute()
+
+
+def finish_rebuild():
+    get_queue().delete(
+        REBUILD_KEY, *(REBUILD_CHANGED_KEY.format(label) for label in get_labels())
+    )
+
+
+def is_rebuilding():
+    return bool(get_queue().exists(REBUILD_KEY))
+
+
+def record_rebuild_changes(model, ids):
+    """
+    Record ids flushed into the index during a rebuild
+    """
+    if ids:
+        get_queue().sadd(REBUILD_CHANGED_KEY.format(get_model_label(model)), *ids)
+
+
+def pop_rebuild_changes(model, count):
+    return _pop(REBUILD_CHANGED_KEY.format(get_model_label(model)), count)
+
+
+def get_labels():
+    return [get_model_label(model) for model in registry.get_models()]
@@ -0,0 +1,188 @@
+import time
+from datetime import datetime
+from multiprocessing import Pool, cpu_count
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk, parallel_bulk
+
+from ecommerce.inventory.models import ProductInventory
+from ecommerce.search.caching import bump_generation
+from ecommerce.search.documents import ProductInventoryDocument
+from ecommerce.search.indexing import (
+    finish_rebuild,
+    pop_rebuild_changes,
+    start_rebuild,
+)
+
+
+def close_db_connections():
+    # forked workers must not share the parent's database connections
+    connections.close_all()
+
+
+def index_queryset(client, index_name, queryset, batch_size):
+    doc = ProductInventoryDocument()
+    actions = (
+        {**doc._prepare_action(instance, "index"), "_index": index_name}
+        for instance in queryset.iterator(chunk_size=batch_size)
+    )
+
+    indexed = 0
+    for success, _ in parallel_bulk(client, actions, chunk_size=batch_size):
+        indexed += success
+    return indexed
+
+
+def index_range(args):
+    """
+    Index one id range into index_name, runs in a worker process
+    """
+    index_name, first_id, last_id, batch_size = args
+    client = Elasticsearch(**settings.ELASTICSEARCH_DSL["default"])
+    queryset = (
+        ProductInventoryDocument()
+        .get_queryset()
+        .filter(id__range=(first_id, last_id))
+        .order_by("id")
+    )
+    return index_queryset(client, index_name, queryset, batch_size)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the productinventory index into a new versioned index "
+        "with parallel workers, replay the changes the search queue flushed "
+        "into the old index meanwhile, then atomically swap the alias to it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=cpu_count())
+        parser.add_argument(
+            "--chunk-size", type=int, default=50_000, help="ids per worker task"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1_000, help="documents per bulk request"
+        )
+        parser.add_argument(
+            "--keep-old", action="store_true", help="do not delete the old indices"
+        )
+
+    def handle(self, *args, **options):
+        document = ProductInventoryDocument
+        alias = document._index._name
+        client = document._get_connection()
+        index_name = f"{alias}-{datetime.now():%Y%m%d%H%M%S}"
+        started_at = datetime.now()
+
+        index = document._index.clone(name=index_name)
+        live_settings = {
+            "number_of_replicas": index._settings.get("number_of_replicas", 1),
+            "refresh_interval": index._settings.get("refresh_interval", "1s"),
+        }
+        index.settings(number_of_replicas=0, refresh_interval="-1")
+        index.create()
+        self.stdout.write(f"Created {index_name}")
+
+        start_rebuild()
+        try:
+            started = time.perf_counter()
+            indexed = self.fill(index_name, options)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Indexed {indexed} documents in {elapsed:.1f}s "
+                f"({indexed / max(elapsed, 0.001):,.0f} docs/s)"
+            )
+
+            # catch up with rows changed while the workers were running,
+            # written directly when the search queue is disabled
+            changed = document().get_queryset().filter(updated_at__gte=started_at)
+            index_queryset(client, index_name, changed, options["batch_size"])
+            self.replay_changes(client, index_name, options["batch_size"])
+
+            client.indices.put_settings(index=index_name, settings=live_settings)
+            client.indices.refresh(index=index_name)
+            self.swap_alias(client, alias, index_name, options["keep_old"])
+            # flushes between the replay and the swap went to the old index
+            self.replay_changes(client, index_name, options["batch_size"])
+        finally:
+            finish_rebuild()
+        bump_generation()
+
+    def replay_changes(self, client, index_name, batch_size):
+        """
+        Apply to index_name the ids the search queue flushed into the old
+        index since the rebuild started: existing rows are reindexed from
+        the database, the others deleted
+        """
+        queryset = ProductInventoryDocument().get_queryset()
+        replayed = 0
+        while ids := pop_rebuild_changes(ProductInventory, batch_size):
+            existing = set(
+                queryset.model.objects.filter(id__in=ids).values_list("id", flat=True)
+            )
+            index_queryset(
+                client, index_name, queryset.filter(id__in=existing), batch_size
+            )
+            bulk(
+                client,
+                (
+                    {"_op_type": "delete", "_index": index_name, "_id": id}
+                    for id in set(ids) - existing
+                ),
+                raise_on_error=False,
+            )
+            replayed += len(ids)
+        self.stdout.write(f"Replayed {replayed} changes")
+
+    def fill(self, index_name, options):
+        bounds = (
+            ProductInventoryDocument()
+            .get_queryset()
+            .aggregate(first_id=Min("id"), last_id=Max("id"))
+        )
+        if bounds["first_id"] is None:
+            return 0
+
+        chunk_size = options["chunk_size"]
+        tasks = [
+            (
+                index_name,
+                start,
+                min(start + chunk_size - 1, bounds["last_id"]),
+                options["batch_size"],
+            )
+            for start in range(bounds["first_id"], bounds["last_id"] + 1, chunk_size)
+        ]
+
+        indexed = 0
+        close_db_connections()
+        with Pool(options["workers"], initializer=close_db_connections) as pool:
+            for done, count in enumerate(pool.imap_unordered(index_range, tasks), 1):
+                indexed += count
+                self.stdout.write(f"  {done}/{len(tasks)} ranges, {indexed} documents")
+        return indexed
+
+    def swap_alias(self, client, alias, index_name, keep_old):
+        if client.indices.exists_alias(name=alias):
+            old_indices = list(client.indices.get_alias(name=alias))
+        elif client.indices.exists(index=alias):
+            # index created by search_index --rebuild, it has to make way for the alias
+            self.stdout.write(f"Deleting concrete index {alias} to create the alias")
+            client.indices.delete(index=alias)
+            old_indices = []
+        else:
+            old_indices = []
+
+        actions = [{"remove": {"index": old, "alias": alias}} for old in old_indices]
+        actions.append({"add": {"index": index_name, "alias": alias}})
+        client.indices.update_aliases(actions=actions)
+        self.stdout.write(f"Alias {alias} -> {index_name}")
+
+        if not keep_old:
+            for old in old_indices:
+                client.indices.delete(index=old)
+                self.stdout.write(f"Deleted {old}")
@@ -0,0 +1,119 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def get_track_total_hits(request):
+    """
+    track_total_hits query param: true, false or a number of hits,
+    defaults to SEARCH_TRACK_TOTAL_HITS
+    """
+    value = request.query_params.get("track_total_hits")
+    if value in ("true", "false"):
+        return value == "true"
+    if value and value.isdigit():
+        return int(value)
+    return settings.SEARCH_TRACK_TOTAL_HITS
+
+
+class SearchLimitOffsetPagination(LimitOffsetPagination):
+    """
+    limit/offset translated to Elasticsearch from/size,
+    count taken from hits.total. Pages past max_result_window are rejected,
+    Elasticsearch refuses them
+    """
+
+    max_limit = 100
+    # index.max_result_window
+    max_result_window = 10_000
+
+    def paginate_search(self, search, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        if self.offset + self.limit > self.max_result_window:
+            raise ValidationError(
+                {
+                    self.offset_query_param: (
+                        f"offset + limit must not exceed {self.max_result_window}, "
+                        "use ?cursor= to page deeper."
+                    )
+                }
+            )
+
+        search = search.extra(
+            from_=self.offset,
+            size=self.limit,
+            track_total_hits=get_track_total_hits(request),
+        )
+        response = self.response = search.execute()
+        self.count = response.hits.total.value
+        return list(response)
+
+
+class SearchAfterPagination(BasePagination):
+    """
+    search_after cursor for deep pagination, every page costs the same as
+    the first. The cursor holds the sort values of the last hit on the page
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    max_limit = 100
+    sort = [{"_score": "desc"}, {"id": "asc"}]
+
+    def paginate_search(self, search, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+
+        search = search.extra(
+            size=self.limit,
+            sort=self.sort,
+            track_total_hits=get_track_total_hits(request),
+        )
+        cursor = self.decode_cursor(request)
+        if cursor:
+            search = search.extra(search_after=cursor)
+
+        response = self.response = search.execute()
+        self.count = response.hits.total.value
+        hits = list(response)
+        self.next_cursor = hits[-1].meta.sort if len(hits) == self.limit else None
+        return hits
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "results": data,
+            }
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK["PAGE_SIZE"]
+        return max(1, min(limit, self.max_limit))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = urlsafe_b64encode(json.dumps(list(self.next_cursor)).encode())
+        return replace_query_param(url, self.cursor_query_param, cursor.decode())
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return json.loads(urlsafe_b64decode(encoded.encode()))
+        except ValueError:
+            raise NotFound("Invalid cursor")
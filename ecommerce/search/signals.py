@@ -0,0 +1,119 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
+from django.dispatch import receiver
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+
+from ecommerce.inventory.models import ProductInventory
+from ecommerce.promotion.models import ProductsOnPromotion
+from ecommerce.promotion.signals import (
+    promotion_prices_changed,
+    promotion_status_changed,
+)
+
+from .documents import ProductInventoryDocument
+from .indexing import enqueue_delete, enqueue_update
+
+
+class QueuedSignalProcessor(RealTimeSignalProcessor):
+    """
+    Record dirty ids on commit instead of indexing inside the request,
+    flush_search_index sends them to Elasticsearch with the bulk API.
+    Falls back to realtime indexing when SEARCH_INDEX_QUEUE_ENABLED is off
+    """
+
+    def handle_save(self, sender, instance, **kwargs):
+        if not settings.SEARCH_INDEX_QUEUE_ENABLED:
+            return super().handle_save(sender, instance, **kwargs)
+        if not DEDConfig.autosync_enabled():
+            return
+
+        if self.is_indexed(instance.__class__):
+            self.on_commit(enqueue_update, instance.__class__, [instance.pk])
+        self.enqueue_related(instance)
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        if not settings.SEARCH_INDEX_QUEUE_ENABLED:
+            return super().handle_pre_delete(sender, instance, **kwargs)
+        if not DEDConfig.autosync_enabled():
+            return
+
+        self.enqueue_related(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if not settings.SEARCH_INDEX_QUEUE_ENABLED:
+            return super().handle_delete(sender, instance, **kwargs)
+        if not DEDConfig.autosync_enabled():
+            return
+
+        if self.is_indexed(instance.__class__):
+            self.on_commit(enqueue_delete, instance.__class__, [instance.pk])
+
+    def enqueue_related(self, instance):
+        for doc in registry._get_related_doc(instance):
+            try:
+                related = doc().get_instances_from_related(instance)
+            except ObjectDoesNotExist:
+                related = None
+
+            if related is None:
+                continue
+            if isinstance(related, models.Model):
+                ids = [related.pk]
+            elif isinstance(related, models.QuerySet):
+                ids = list(related.values_list("pk", flat=True))
+            else:
+                ids = [item.pk for item in related]
+            self.on_commit(enqueue_update, doc.django.model, ids)
+
+    @staticmethod
+    def is_indexed(model):
+        return any(
+            not doc.django.ignore_signals for doc in registry.get_documents([model])
+        )
+
+    @staticmethod
+    def on_commit(func, *args):
+        transaction.on_commit(partial(func, *args))
+
+
+def reindex_promotions(promotion_ids):
+    """
+    Refresh the promotion_price of every SKU in the given promotions
+    """
+    if not DEDConfig.autosync_enabled():
+        return
+
+    inventory_ids = (
+        ProductsOnPromotion.objects.filter(promotion_id__in=promotion_ids)
+        .values_list("product_inventory_id", flat=True)
+        .distinct()
+    )
+    if not settings.SEARCH_INDEX_QUEUE_ENABLED:
+        doc = ProductInventoryDocument()
+        doc.update(doc.get_queryset().filter(id__in=inventory_ids))
+        return
+
+    batch = []
+    for inventory_id in inventory_ids.iterator(
+        chunk_size=settings.SEARCH_INDEX_BATCH_SIZE
+    ):
+        batch.append(inventory_id)
+        if len(batch) == settings.SEARCH_INDEX_BATCH_SIZE:
+            enqueue_update(ProductInventory, batch)
+            batch = []
+    enqueue_update(ProductInventory, batch)
+
+
+@receiver(promotion_prices_changed)
+def reindex_repriced_promotion(sender, promotion_id, **kwargs):
+    reindex_promotions([promotion_id])
+
+
+@receiver(promotion_status_changed)
+def reindex_started_and_ended_promotions(sender, activated, deactivated, **kwargs):
+    reindex_promotions(activated + deactivated)
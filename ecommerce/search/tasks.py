@@ -0,0 +1,78 @@
+from celery import shared_task
+from django.conf import settings
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch import ApiError, TransportError
+
+from .caching import bump_generation
+from .indexing import (
+    FLUSH_SCHEDULED_KEY,
+    enqueue_delete,
+    enqueue_update,
+    get_queue,
+    is_rebuilding,
+    pop_deleted,
+    pop_dirty,
+    record_rebuild_changes,
+)
+
+
+@shared_task(
+    autoretry_for=(ApiError, TransportError),
+    retry_backoff=True,
+    retry_backoff_max=settings.SEARCH_INDEX_FLUSH_RETRY_BACKOFF_MAX,
+    max_retries=None,
+)
+def flush_search_index():
+    """
+    Send queued ids to Elasticsearch in bulk batches of SEARCH_INDEX_BATCH_SIZE,
+    then invalidate the cached search results. On Elasticsearch errors the
+    ids go back to the queue and the task retries with exponential backoff.
+    During a search-reindex the flushed ids are also recorded for it
+    """
+    get_queue().delete(FLUSH_SCHEDULED_KEY)
+    batch_size = settings.SEARCH_INDEX_BATCH_SIZE
+    rebuilding = is_rebuilding()
+    indexed = deleted = 0
+
+    for model in registry.get_models():
+        documents = [
+            doc()
+            for doc in registry.get_documents([model])
+            if not doc.django.ignore_signals
+        ]
+
+        while ids := pop_dirty(model, batch_size):
+            if rebuilding:
+                record_rebuild_changes(model, ids)
+            try:
+                for doc in documents:
+                    doc.update(doc.get_queryset().filter(pk__in=ids), refresh=False)
+            except Exception:
+                enqueue_update(model, ids, flush=False)
+                raise
+            indexed += len(ids)
+
+        while ids := pop_deleted(model, batch_size):
+            if rebuilding:
+                record_rebuild_changes(model, ids)
+            try:
+                for doc in documents:
+                    doc.bulk(
+                        (
+                            {
+                                "_op_type": "delete",
+                                "_index": doc._index._name,
+                                "_id": id,
+                            }
+                            for id in ids
+                        ),
+                        raise_on_error=False,
+                    )
+            except Exception:
+                enqueue_delete(model, ids, flush=False)
+                raise
+            deleted += len(ids)
+
+    if indexed or deleted:
+        bump_generation()
+    return {"indexed": indexed, "deleted": deleted}
@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from elasticsearch_dsl import Search
+
+from ecommerce.search.backends import has_trigram
+from ecommerce.search.client import elasticsearch_breaker
+
+POSTGRES_BACKEND = "ecommerce.search.backends.PostgresBackend"
+
+
+@pytest.fixture
+def postgres_search(settings):
+    settings.SEARCH_BACKEND = POSTGRES_BACKEND
+    settings.SEARCH_FALLBACK_BACKEND = None
+
+
+def test_postgres_backend_full_text(
+    api_client, postgres_search, single_sub_product_with_media_and_attributes
+):
+    response = api_client().get("/api/search/default/?price_max=100")
+
+    assert response.data["count"] == 1
+    assert response.data["results"][0]["sku"] == "123456789"
+    assert response.data["results"][0]["store_price"] == "99.99"
+    assert response.data["results"][0]["category"] == {
+        "name": "child",
+        "path": ["parent", "child"],
+    }
+    assert response.data["facets"]["brand"] == [{"value": "default", "count": 1}]
+    assert response.data["facets"]["attributes"] == {
+        "default": [{"value": "default", "count": 1}]
+    }
+    assert {"from": 50, "to": 100, "count": 1} in response.data["facets"]["price"]
+
+
+def test_postgres_backend_identifier(
+    api_client, postgres_search, single_sub_product_with_media_and_attributes
+):
+    response = api_client().get("/api/search/100000000001/")
+
+    assert [card["sku"] for card in response.data["results"]] == ["123456789"]
+
+
+def test_postgres_backend_trigram(
+    api_client, postgres_search, single_sub_product_with_media_and_attributes
+):
+    if not has_trigram():
+        pytest.skip("pg_trgm is not available")
+
+    response = api_client().get("/api/search/defualt/")
+
+    assert response.data["count"] == 1
+
+
+def test_fallback_when_elasticsearch_fails(
+    settings, api_client, monkeypatch, single_sub_product_with_media_and_attributes
+):
+    settings.SEARCH_FALLBACK_BACKEND = POSTGRES_BACKEND
+
+    def execute(search, ignore_cache=False):
+        raise ConnectionError("cluster unavailable")
+
+    monkeypatch.setattr(Search, "execute", execute)
+
+    try:
+        response = api_client().get("/api/search/default/")
+
+        assert response.status_code == 200
+        assert response.data["count"] == 1
+        assert not cache.get(elasticsearch_breaker.open_key)
+    finally:
+        elasticsearch_breaker.reset()
@@ -0,0 +1,32 @@
+from ecommerce.search.caching import bump_generation, get_stats
+from ecommerce.search.tests.test_search import fake_execute
+
+
+def test_search_results_cached_until_generation_bump(settings, api_client, monkeypatch):
+    settings.SEARCH_RESULT_CACHE_TIMEOUT = 300
+    executed = fake_execute(monkeypatch, [2, 3])
+    bump_generation()
+    before = get_stats()
+
+    first = api_client().get("/api/search/running  shoes/?brand=nike&limit=5")
+    second = api_client().get("/api/search/running shoes/?limit=5&brand=nike")
+    bump_generation()
+    third = api_client().get("/api/search/running shoes/?limit=5&brand=nike")
+
+    after = get_stats()
+    assert len(executed) == 2
+    assert second.data == first.data
+    assert third.data["count"] == 3
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+
+
+def test_search_cache_stats_admin_only(api_client, create_admin_user):
+    client = api_client()
+    assert client.get("/api/search-stats/").status_code in (401, 403)
+
+    client.force_authenticate(create_admin_user)
+    response = client.get("/api/search-stats/")
+
+    assert response.status_code == 200
+    assert set(response.data) == {"generation", "hits", "misses", "hit_ratio"}
@@ -0,0 +1,90 @@
+import pytest
+from django.core.cache import cache
+from elastic_transport import ConnectionTimeout
+from elasticsearch_dsl import Search
+
+from ecommerce.search.client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    elasticsearch_breaker,
+)
+
+
+@pytest.fixture
+def breaker(settings):
+    settings.SEARCH_BREAKER_FAILURES = 2
+    breaker = CircuitBreaker("test")
+    breaker.reset()
+    yield breaker
+    breaker.reset()
+
+
+def timeout():
+    raise ConnectionTimeout("timed out")
+
+
+def test_breaker_opens_after_failures_and_fails_fast(breaker):
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(ConnectionTimeout):
+            breaker.call(timeout)
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+
+    assert breaker.is_open
+    assert calls == []
+
+
+def test_breaker_counts_failures_between_successes(breaker):
+    with pytest.raises(ConnectionTimeout):
+        breaker.call(timeout)
+    breaker.call(lambda: None)
+    with pytest.raises(ConnectionTimeout):
+        breaker.call(timeout)
+
+    assert breaker.is_open
+
+
+def test_breaker_closes_after_half_open_success(breaker):
+    breaker.trip()
+    # SEARCH_BREAKER_RESET_TIMEOUT elapsed
+    cache.delete(breaker.open_key)
+    breaker.call(lambda: None)
+    with pytest.raises(ConnectionTimeout):
+        breaker.call(timeout)
+
+    assert not breaker.is_open
+
+
+def test_breaker_ignores_client_errors(breaker):
+    def bad_request():
+        raise ValueError("bad query")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            breaker.call(bad_request)
+
+    assert not breaker.is_open
+
+
+def test_breaker_counts_slow_calls(settings, breaker):
+    settings.SEARCH_SLOW_THRESHOLD = -1
+
+    breaker.call(lambda: None)
+    breaker.call(lambda: None)
+
+    assert breaker.is_open
+
+
+def test_suggest_degrades_while_breaker_open(settings, api_client, monkeypatch):
+    settings.SEARCH_SUGGEST_CACHE_TIMEOUT = 0
+    monkeypatch.setattr(Search, "execute", lambda search, ignore_cache=False: 1 / 0)
+    elasticsearch_breaker.trip()
+
+    try:
+        response = api_client().get("/api/suggest/zzz/")
+    finally:
+        elasticsearch_breaker.reset()
+
+    assert response.data == {"suggestions": [], "degraded": True}
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from ecommerce.inventory.models import Stock
+from ecommerce.search.documents import ProductInventoryDocument
+
+
+def test_product_inventory_card(
+    django_assert_num_queries,
+    promotion_multi_variant,
+    single_sub_product_with_media_and_attributes,
+):
+    fixture = single_sub_product_with_media_and_attributes
+    Stock.objects.create(product_inventory=fixture["inventory"], units=3)
+    doc = ProductInventoryDocument()
+
+    with django_assert_num_queries(5):
+        cards = [doc.prepare(instance) for instance in doc.get_queryset()]
+
+    assert cards[0]["is_default"] is True
+    assert cards[0]["image_url"] == fixture["media"].img_url.url
+    assert cards[0]["promotion_price"] == Decimal("100.00")
+    assert cards[0]["in_stock"] is True
+    assert cards[0]["attributes"] == ["default:default"]
+    assert cards[0]["category"] == {
+        "name": "child",
+        "slug": "child",
+        "path": ["parent", "child"],
+    }
+
+
+def test_suggest_only_for_active_default_sub_products(
+    single_sub_product_with_media_and_attributes,
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    doc = ProductInventoryDocument()
+
+    assert doc.prepare_suggest(inventory) == {
+        "input": ["default", "123456789", "default"]
+    }
+
+    inventory.is_default = False
+    assert doc.prepare_suggest(inventory) is None
+
+    inventory.is_default = True
+    inventory.is_active = False
+    assert doc.prepare_suggest(inventory) is None
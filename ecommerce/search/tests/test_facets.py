@@ -0,0 +1,60 @@
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+
+def test_search_filters_and_facets(api_client, monkeypatch):
+    executed = []
+
+    def execute(search, ignore_cache=False):
+        executed.append(search.to_dict())
+        return Response(
+            search,
+            {
+                "hits": {"total": {"value": 0}, "hits": []},
+                "aggregations": {
+                    "brand": {"buckets": [{"key": "nike", "doc_count": 3}]},
+                    "category": {"buckets": [{"key": "shoes", "doc_count": 3}]},
+                    "attributes": {
+                        "buckets": [
+                            {"key": "size:9", "doc_count": 2},
+                            {"key": "size:10", "doc_count": 1},
+                        ]
+                    },
+                    "price": {
+                        "buckets": [
+                            {"key": "50.0-100.0", "from": 50, "to": 100, "doc_count": 3}
+                        ]
+                    },
+                },
+            },
+        )
+
+    monkeypatch.setattr(Search, "execute", execute)
+
+    response = api_client().get(
+        "/api/search/shoe/?brand=nike&category=shoes&price_min=50&price_max=100"
+        "&attribute=size:9"
+    )
+
+    body = executed[0]
+    assert body["query"]["bool"]["filter"] == [
+        {"terms": {"brand.name.raw": ["nike"]}},
+        {"term": {"category.path": "shoes"}},
+        {"term": {"attributes": "size:9"}},
+        {"range": {"store_price": {"gte": 50.0, "lte": 100.0}}},
+    ]
+    assert set(body["aggs"]) == {"brand", "category", "attributes", "price"}
+    assert response.data["facets"] == {
+        "brand": [{"value": "nike", "count": 3}],
+        "category": [{"value": "shoes", "count": 3}],
+        "attributes": {
+            "size": [{"value": "9", "count": 2}, {"value": "10", "count": 1}]
+        },
+        "price": [{"from": 50, "to": 100, "count": 3}],
+    }
+
+
+def test_search_rejects_invalid_price(api_client):
+    response = api_client().get("/api/search/shoe/?price_min=cheap")
+
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+import pytest
+from celery.exceptions import Retry
+from elasticsearch import ConnectionError
+
+from ecommerce.inventory.models import ProductInventory
+from ecommerce.search import indexing
+from ecommerce.search.documents import ProductInventoryDocument
+from ecommerce.search.indexing import DELETED_KEY, DIRTY_KEY, get_queue
+from ecommerce.search.tasks import flush_search_index
+
+
+def test_queued_signal_processor_records_dirty_ids(
+    settings,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+    single_sub_product_with_media_and_attributes,
+):
+    settings.SEARCH_INDEX_QUEUE_ENABLED = True
+    settings.ELASTICSEARCH_DSL_AUTOSYNC = True
+    monkeypatch.setattr(indexing, "schedule_flush", lambda pending: None)
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    dirty_key = DIRTY_KEY.format("inventory.productinventory")
+    deleted_key = DELETED_KEY.format("inventory.productinventory")
+    get_queue().delete(dirty_key, deleted_key)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory.save()
+
+    assert get_queue().smembers(dirty_key) == {str(inventory.id).encode()}
+    assert indexing.pop_dirty(ProductInventory, 10) == [inventory.id]
+    assert get_queue().scard(dirty_key) == 0
+    get_queue().delete(dirty_key, deleted_key)
+
+
+def test_flush_requeues_ids_and_retries_on_elasticsearch_error(
+    monkeypatch, single_sub_product_with_media_and_attributes
+):
+    def unavailable(self, *args, **kwargs):
+        raise ConnectionError("unavailable")
+
+    scheduled = []
+    monkeypatch.setattr(indexing, "schedule_flush", scheduled.append)
+    monkeypatch.setattr(ProductInventoryDocument, "update", unavailable)
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    dirty_key = DIRTY_KEY.format("inventory.productinventory")
+    get_queue().delete(dirty_key)
+    indexing.enqueue_update(ProductInventory, [inventory.id])
+    scheduled.clear()
+
+    retries = []
+
+    def retry(exc=None, countdown=None, **kwargs):
+        retries.append((exc, countdown))
+        raise Retry()
+
+    monkeypatch.setattr(flush_search_index, "retry", retry)
+
+    with pytest.raises(Retry):
+        flush_search_index()
+
+    assert isinstance(retries[0][0], ConnectionError)
+    assert retries[0][1] >= 0
+    assert indexing.pop_dirty(ProductInventory, 10) == [inventory.id]
+    # the retry flushes them, not a new task
+    assert scheduled == []
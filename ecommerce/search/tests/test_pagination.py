@@ -0,0 +1,62 @@
+import pytest
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ecommerce.search.pagination import (
+    SearchAfterPagination,
+    SearchLimitOffsetPagination,
+)
+
+
+@pytest.fixture
+def executed_searches(monkeypatch):
+    """
+    Replace Search.execute with a fake 25 hit result, record the request bodies
+    """
+    bodies = []
+
+    def execute(search, ignore_cache=False):
+        body = search.to_dict()
+        bodies.append(body)
+        hits = [
+            {"_id": str(i), "_source": {"id": i}, "sort": [1.0, i]}
+            for i in range(
+                body.get("from", 0), min(body.get("from", 0) + body["size"], 25)
+            )
+        ]
+        return Response(search, {"hits": {"total": {"value": 25}, "hits": hits}})
+
+    monkeypatch.setattr(Search, "execute", execute)
+    return bodies
+
+
+def get_request(url):
+    return Request(APIRequestFactory().get(url))
+
+
+def test_limit_offset_pushed_down_to_elasticsearch(executed_searches):
+    paginator = SearchLimitOffsetPagination()
+    hits = paginator.paginate_search(
+        Search(), get_request("/api/search/a/?limit=5&offset=20")
+    )
+    response = paginator.get_paginated_response([hit.id for hit in hits])
+
+    assert executed_searches[0]["from"] == 20
+    assert executed_searches[0]["size"] == 5
+    assert response.data["count"] == 25
+    assert response.data["results"] == [20, 21, 22, 23, 24]
+    assert response.data["next"] is None
+
+
+def test_search_after_cursor(executed_searches):
+    paginator = SearchAfterPagination()
+    paginator.paginate_search(Search(), get_request("/api/search/a/?cursor=&limit=5"))
+    next_link = paginator.get_paginated_response([]).data["next"]
+
+    SearchAfterPagination().paginate_search(Search(), get_request(next_link))
+
+    assert "search_after" not in executed_searches[0]
+    assert executed_searches[1]["search_after"] == [1.0, 4]
+    assert executed_searches[1]["sort"] == SearchAfterPagination.sort
@@ -0,0 +1,150 @@
+import io
+from importlib import import_module
+
+import pytest
+from django.core.management import call_command
+from elasticsearch_dsl import Index
+
+from ecommerce.inventory.models import ProductInventory
+from ecommerce.search import indexing
+from ecommerce.search.documents import ProductInventoryDocument
+from ecommerce.search.tasks import flush_search_index
+
+reindex = import_module("ecommerce.search.management.commands.search-reindex")
+
+
+class FakeIndices:
+    def __init__(self, alias, old_index):
+        self.aliases = {alias: old_index}
+        self.deleted = []
+        self.alias_actions = []
+
+    def exists_alias(self, name):
+        return name in self.aliases
+
+    def get_alias(self, name):
+        return {self.aliases[name]: {"aliases": {name: {}}}}
+
+    def exists(self, index):
+        return False
+
+    def delete(self, index):
+        self.deleted.append(index)
+
+    def update_aliases(self, actions):
+        self.alias_actions = actions
+
+    def put_settings(self, index, settings):
+        pass
+
+    def refresh(self, index):
+        pass
+
+
+class FakeClient:
+    def __init__(self, alias, old_index):
+        self.indices = FakeIndices(alias, old_index)
+
+
+class InlinePool:
+    def __init__(self, processes, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def imap_unordered(self, func, tasks):
+        return map(func, tasks)
+
+
+@pytest.fixture
+def elasticsearch(monkeypatch):
+    """
+    search-reindex against an in-memory client, bulk actions are collected
+    """
+    alias = ProductInventoryDocument._index._name
+    client = FakeClient(alias, f"{alias}-old")
+    client.actions = []
+
+    def parallel_bulk(client, actions, chunk_size):
+        for action in actions:
+            client.actions.append(action)
+            yield True, {}
+
+    def bulk(client, actions, raise_on_error):
+        actions = list(actions)
+        client.actions.extend(actions)
+        return len(actions), []
+
+    monkeypatch.setattr(ProductInventoryDocument, "_get_connection", lambda: client)
+    monkeypatch.setattr(Index, "create", lambda self, **kwargs: None)
+    monkeypatch.setattr(reindex, "Elasticsearch", lambda **kwargs: client)
+    monkeypatch.setattr(reindex, "Pool", InlinePool)
+    monkeypatch.setattr(reindex, "close_db_connections", lambda: None)
+    monkeypatch.setattr(reindex, "parallel_bulk", parallel_bulk)
+    monkeypatch.setattr(reindex, "bulk", bulk)
+    return client
+
+
+def test_reindex_swaps_alias_to_new_index(
+    elasticsearch, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    alias = ProductInventoryDocument._index._name
+
+    call_command("search-reindex", workers=1, stdout=io.StringIO())
+
+    new_index = elasticsearch.indices.alias_actions[-1]["add"]["index"]
+    assert new_index.startswith(f"{alias}-")
+    assert [(action["_index"], action["_id"]) for action in elasticsearch.actions] == [
+        (new_index, inventory.id)
+    ]
+    assert elasticsearch.indices.alias_actions[0] == {
+        "remove": {"index": f"{alias}-old", "alias": alias}
+    }
+    assert elasticsearch.indices.deleted == [f"{alias}-old"]
+    assert not indexing.is_rebuilding()
+
+
+def test_reindex_replays_changes_flushed_during_rebuild(
+    monkeypatch, elasticsearch, single_sub_product_with_media_and_attributes
+):
+    inventory = single_sub_product_with_media_and_attributes["inventory"]
+    deleted = ProductInventory.objects.get(pk=inventory.pk)
+    deleted.pk = None
+    deleted.sku = deleted.upc = "deleted"
+    deleted.save()
+    deleted_id = deleted.id
+    fill = reindex.Command.fill
+
+    def fill_then_change(self, index_name, options):
+        indexed = fill(self, index_name, options)
+        # a stock change and a delete flushed into the old index meanwhile
+        deleted.delete()
+        indexing.enqueue_update(ProductInventory, [inventory.id])
+        indexing.enqueue_delete(ProductInventory, [deleted_id])
+        flush_search_index()
+        return indexed
+
+    monkeypatch.setattr(indexing, "schedule_flush", lambda pending: None)
+    monkeypatch.setattr(ProductInventoryDocument, "update", lambda *args, **kw: None)
+    monkeypatch.setattr(ProductInventoryDocument, "bulk", lambda *args, **kw: None)
+    monkeypatch.setattr(reindex.Command, "fill", fill_then_change)
+
+    call_command("search-reindex", workers=1, stdout=io.StringIO())
+
+    new_index = elasticsearch.indices.alias_actions[-1]["add"]["index"]
+    actions = [
+        (action.get("_op_type", "index"), action["_index"], action["_id"])
+        for action in elasticsearch.actions
+    ]
+    assert actions == [
+        ("index", new_index, inventory.id),
+        ("index", new_index, deleted_id),
+        ("index", new_index, inventory.id),
+        ("delete", new_index, deleted_id),
+    ]
+    assert indexing.pop_rebuild_changes(ProductInventory, 10) == []
@@ -0,0 +1,113 @@
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+
+def fake_execute(monkeypatch, totals):
+    """
+    Replace Search.execute, the n-th search gets totals[n] hits
+    """
+    executed = []
+
+    def execute(search, ignore_cache=False):
+        total = totals[len(executed)]
+        executed.append(search.to_dict())
+        hits = [{"_id": str(i), "_source": {"id": i}} for i in range(total)]
+        aggs = {"buckets": []}
+        return Response(
+            search,
+            {
+                "hits": {"total": {"value": total}, "hits": hits},
+                "aggregations": {
+                    "brand": aggs,
+                    "category": aggs,
+                    "attributes": aggs,
+                    "price": aggs,
+                },
+            },
+        )
+
+    monkeypatch.setattr(Search, "execute", execute)
+    return executed
+
+
+def test_identifier_query_uses_term_lookup(api_client, monkeypatch):
+    executed = fake_execute(monkeypatch, [1])
+
+    response = api_client().get("/api/search/7633969397/")
+
+    assert len(executed) == 1
+    should = executed[0]["query"]["constant_score"]["filter"]["bool"]["should"]
+    assert {"term": {"sku.raw": "7633969397"}} in should
+    assert {"term": {"upc": "7633969397"}} in should
+    assert response.data["results"] == [{"id": 0}]
+
+
+def test_identifier_query_falls_back_to_full_text(api_client, monkeypatch):
+    executed = fake_execute(monkeypatch, [0, 2])
+
+    response = api_client().get("/api/search/air90/")
+
+    assert len(executed) == 2
+    assert "multi_match" in str(executed[1]["query"])
+    assert response.data["count"] == 2
+
+
+def test_text_query_skips_term_lookup(api_client, monkeypatch):
+    executed = fake_execute(monkeypatch, [2])
+
+    api_client().get("/api/search/running shoes/")
+
+    assert len(executed) == 1
+    assert "constant_score" not in executed[0]["query"]
+
+
+def test_offset_past_max_result_window_rejected(api_client, monkeypatch):
+    executed = fake_execute(monkeypatch, [1])
+
+    response = api_client().get("/api/search/shoes/?offset=9990&limit=20")
+
+    assert response.status_code == 400
+    assert "cursor" in response.data["offset"]
+    assert executed == []
+
+
+def test_search_failure_returns_json_503(api_client, monkeypatch, caplog):
+    def fail(request, query):
+        raise RuntimeError("password=secret")
+
+    monkeypatch.setattr("ecommerce.search.views.search", fail)
+
+    response = api_client().get("/api/search/shoes/")
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Search is unavailable."}
+    assert "password=secret" in caplog.text
+
+
+def test_results_render_prices_as_decimal_strings(api_client, monkeypatch):
+    def execute(search, ignore_cache=False):
+        source = {"id": 1, "sku": "sku", "store_price": 99.9, "promotion_price": 80.0}
+        aggs = {"buckets": []}
+        return Response(
+            search,
+            {
+                "hits": {
+                    "total": {"value": 1},
+                    "hits": [{"_id": "1", "_source": source}],
+                },
+                "aggregations": {
+                    "brand": aggs,
+                    "category": aggs,
+                    "attributes": aggs,
+                    "price": aggs,
+                },
+            },
+        )
+
+    monkeypatch.setattr(Search, "execute", execute)
+
+    response = api_client().get("/api/search/shoes/")
+
+    assert response.json()["results"] == [
+        {"id": 1, "sku": "sku", "store_price": "99.90", "promotion_price": "80.00"}
+    ]
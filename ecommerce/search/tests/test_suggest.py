@@ -0,0 +1,45 @@
+from hashlib import md5
+
+from django.core.cache import cache
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+
+def test_suggest_caches_hot_prefixes(api_client, db, monkeypatch):
+    executed = []
+
+    def execute(search, ignore_cache=False):
+        executed.append(search.to_dict())
+        options = [{"text": "Nike Air", "_id": "1"}, {"text": "Nike Dunk", "_id": "2"}]
+        return Response(
+            search,
+            {
+                "hits": {"total": {"value": 0}, "hits": []},
+                "suggest": {"products": [{"text": "nik", "options": options}]},
+            },
+        )
+
+    monkeypatch.setattr(Search, "execute", execute)
+    cache.delete("search:suggest:" + md5(b"nik").hexdigest())
+
+    first = api_client().get("/api/suggest/Nik/")
+    second = api_client().get("/api/suggest/nik/")
+
+    assert first.data == {"suggestions": ["Nike Air", "Nike Dunk"]}
+    assert second.data == first.data
+    assert len(executed) == 1
+    assert executed[0]["suggest"]["products"]["completion"]["field"] == "suggest"
+
+
+def test_suggest_failure_returns_json_503(api_client, db, monkeypatch, caplog):
+    def execute(search, ignore_cache=False):
+        raise RuntimeError("password=secret")
+
+    monkeypatch.setattr(Search, "execute", execute)
+    cache.delete("search:suggest:" + md5(b"boom").hexdigest())
+
+    response = api_client().get("/api/suggest/boom/")
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Search is unavailable."}
+    assert "password=secret" in caplog.text
@@ -1,41 +1,117 @@
-from django.http import HttpResponse
+import logging
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
-from rest_framework.pagination import LimitOffsetPagination
-from elasticsearch_dsl import Q
 
-from ecommerce.drf.serializer import ProductInventorySearchSerializer
+from ecommerce.search.backends import search
+from ecommerce.search.client import (
+    CircuitOpenError,
+    elasticsearch_breaker,
+    get_client,
+)
+from ecommerce.search.caching import get_result_key, get_stats, record
 from ecommerce.search.documents import ProductInventoryDocument
 
+logger = logging.getLogger(__name__)
+
 
-class SearchProductInventory(APIView, LimitOffsetPagination):
+class SearchProductInventory(APIView):
     """
-    View for search in product.name, product.web_id, brand.name
+    View for search in product.name, product.web_id, brand.name,
+    identifier-shaped queries are looked up exactly on sku, upc and web_id
     endpoint: api/search/<str:query>/
+    ?limit=&offset= pages with from/size, ?cursor= switches to search_after
+    ?brand=&category=&price_min=&price_max=&attribute=name:value filter the
+    results, facets hold the aggregation buckets of the filtered results
+    Results are product cards from SEARCH_BACKEND, pages are cached
+    until the next index flush
     """
 
-    productinventory_serializer = ProductInventorySearchSerializer
-    search_document = ProductInventoryDocument
-
     def get(self, request, query):
+        key = get_result_key(request.get_host(), query, request.query_params)
+        data = cache.get(key)
+        record(hit=data is not None)
+        if data is not None:
+            return Response(data)
+
         try:
-            q = Q(
-                "multi_match",
-                query=query,
-                fields=["product.name", "product.web_id", "brand.name"],
-                fuzziness="auto",
-            ) & Q(
-                should=[
-                    Q("match", is_default=True),
-                ],
-                minimum_should_match=1,
+            response = search(request, query)
+        except APIException:
+            raise
+        except CircuitOpenError:
+            return Response(
+                {"detail": "Search is temporarily unavailable."},
+                status=503,
+                headers={"Retry-After": str(settings.SEARCH_BREAKER_RESET_TIMEOUT)},
             )
+        except Exception:
+            logger.exception("Search for %r failed", query)
+            return Response({"detail": "Search is unavailable."}, status=503)
+
+        if not getattr(response, "degraded", False):
+            cache.set(key, response.data, settings.SEARCH_RESULT_CACHE_TIMEOUT)
+        return response
+
+
+class SearchCacheStats(APIView):
+    """
+    Hit/miss counters of the search result cache
+    endpoint: api/search-stats/
+    """
 
-            search = self.search_document.search().query(q)
-            response = search.execute()
+    permission_classes = [IsAdminUser]
 
-            result = self.paginate_queryset(response, request, view=self)
-            serializer = self.productinventory_serializer(result, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get(self, request):
+        return Response(get_stats())
 
-        except Exception as e:
-            return HttpResponse(e, status=500)
+
+class SuggestProductInventory(APIView):
+    """
+    Typeahead suggestions from the completion suggester on product.name,
+    brand.name and sku, hot prefixes are cached for a few seconds,
+    no suggestions while the Elasticsearch circuit breaker is open
+    endpoint: api/suggest/<str:prefix>/
+    """
+
+    search_document = ProductInventoryDocument
+
+    def get(self, request, prefix):
+        prefix = " ".join(prefix.lower().split())[:50]
+        key = "search:suggest:" + md5(prefix.encode()).hexdigest()
+
+        suggestions = cache.get(key)
+        if suggestions is None:
+            try:
+                suggestions = elasticsearch_breaker.call(self.suggest, prefix)
+            except CircuitOpenError:
+                # typeahead degrades to no suggestions instead of an error
+                return Response({"suggestions": [], "degraded": True})
+            except Exception:
+                logger.exception("Suggest for %r failed", prefix)
+                return Response({"detail": "Search is unavailable."}, status=503)
+            cache.set(key, suggestions, settings.SEARCH_SUGGEST_CACHE_TIMEOUT)
+
+        return Response({"suggestions": suggestions})
+
+    def suggest(self, prefix):
+        search = (
+            self.search_document.search(using=get_client("suggest"))
+            .suggest(
+                "products",
+                prefix,
+                completion={
+                    "field": "suggest",
+                    "size": settings.SEARCH_SUGGEST_SIZE,
+                    "skip_duplicates": True,
+                },
+            )
+            .source(False)
+            .extra(size=0)
+        )
+        response = search.execute()
+        return [option.text for option in response.suggest.products[0].options]
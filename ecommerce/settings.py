@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Local applications
     "ecommerce.inventory",
     "ecommerce.drf",
@@ -137,16 +138,107 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASS": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
+    "DEFAULT_RENDERER_CLASSES": [
+        "ecommerce.drf.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
-ELASTICSEARCH_DSL = {"default": {"hosts": "http://elasticsearch:9200"}}
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://redis_ecommerce:6379/1",
+    }
+}
+
+# Tagged API responses, invalidated by model signals, see drf.caching
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# Safety net for tree changes that bypass Category signals (bulk_create, rebuild)
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60
+
+# Pooled keep-alive connections shared by every request of a worker,
+# indexing uses these timeouts and retries as they are
+ELASTICSEARCH_DSL = {
+    "default": {
+        "hosts": "http://elasticsearch:9200",
+        "connections_per_node": 25,
+        "request_timeout": 30,
+        "max_retries": 3,
+        "retry_on_timeout": True,
+    }
+}
+
+# Client options of the request/response endpoints, see search.client.get_client
+SEARCH_CLIENT_OPTIONS = {
+    "suggest": {"request_timeout": 0.3, "max_retries": 0},
+    "search": {"request_timeout": 2, "max_retries": 1, "retry_on_timeout": False},
+}
+
+# Circuit breaker of the search endpoints: SEARCH_BREAKER_FAILURES failures or
+# calls slower than SEARCH_SLOW_THRESHOLD seconds within SEARCH_BREAKER_WINDOW
+# seconds fail requests fast for SEARCH_BREAKER_RESET_TIMEOUT seconds
+SEARCH_BREAKER_FAILURES = 5
+SEARCH_BREAKER_WINDOW = 30
+SEARCH_BREAKER_RESET_TIMEOUT = 15
+SEARCH_SLOW_THRESHOLD = 1.0
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = "ecommerce.search.signals.QueuedSignalProcessor"
+
+# Dirty ids recorded by QueuedSignalProcessor, flushed by flush_search_index
+SEARCH_INDEX_QUEUE_ENABLED = True
+SEARCH_INDEX_QUEUE_URL = "redis://redis_ecommerce:6379/2"
+SEARCH_INDEX_BATCH_SIZE = 500
+SEARCH_INDEX_FLUSH_INTERVAL = 5
+# Upper bound in seconds of the backoff between retries of a failed flush
+SEARCH_INDEX_FLUSH_RETRY_BACKOFF_MAX = 300
+
+# Default track_total_hits of search requests, hits.total is exact up to this value
+SEARCH_TRACK_TOTAL_HITS = 10_000
+
+# Backend answering search requests, the fallback answers when it fails
+# or its circuit breaker is open
+SEARCH_BACKEND = "ecommerce.search.backends.ElasticsearchBackend"
+SEARCH_FALLBACK_BACKEND = "ecommerce.search.backends.PostgresBackend"
+
+# Search result pages are cached until the next index flush, at most this long
+SEARCH_RESULT_CACHE_TIMEOUT = 300
+
+SEARCH_SUGGEST_SIZE = 10
+SEARCH_SUGGEST_CACHE_TIMEOUT = 30
 
 CELERY_BROKER_URL = "redis://redis_ecommerce:6379/0"
 CELERY_RESULT_BACKEND = "redis://redis_ecommerce:6379/0"
 
+# Number of ProductsOnPromotion ids priced by one promotion_prices_chunk task
+PROMOTION_PRICES_CHUNK_SIZE = 50_000
+
+# Seconds a promotion has to stay unedited before it is repriced
+PROMOTION_REPRICE_DEBOUNCE = 5
+# Upper bound for how long one promotion_reprice task holds its lock,
+# fanned out reprices hold it until their chord finishes
+PROMOTION_REPRICE_LOCK_TIMEOUT = 1800
+
+# promotion_status tasks are queued at most this many seconds before their
+# eta: the Redis broker redelivers unacknowledged tasks after its
+# visibility_timeout, 1 hour by default, so workers would hold a copy of a
+# far eta task per hour. promotion_schedule queues the later ones
+PROMOTION_STATUS_ETA_HORIZON = 60 * 50
+
 CELERY_BEAT_SCHEDULE = {
-    "sample_task": {
-        "task": "ecommerce.promotion.promotion_management",
-        "schedule": crontab(minute="0", hour="1"),
+    # safety net for the promotion_status tasks scheduled at promo_start/promo_end
+    "promotion_management": {
+        "task": "ecommerce.promotion.tasks.promotion_management",
+        "schedule": crontab(minute="0", hour="0"),
+    },
+    # promotion_status tasks of the promotions starting or ending at midnight,
+    # within PROMOTION_STATUS_ETA_HORIZON
+    "promotion_schedule": {
+        "task": "ecommerce.promotion.tasks.promotion_schedule",
+        "schedule": crontab(minute="30", hour="23"),
+    },
+    # safety net for queued ids whose flush was lost, e.g. with its worker
+    "flush_search_index": {
+        "task": "ecommerce.search.tasks.flush_search_index",
+        "schedule": crontab(minute="*"),
     },
 }
@@ -1,7 +1,41 @@
 import pytest
+from django.core.cache import cache
 from django.core.management import call_command
 
 
+@pytest.fixture(autouse=True)
+def search_index_sync(settings):
+    """
+    Index synchronously in tests instead of queueing dirty ids
+    :param settings:
+    :return:
+    """
+    settings.SEARCH_INDEX_QUEUE_ENABLED = False
+
+
+@pytest.fixture(autouse=True)
+def search_result_cache(settings):
+    """
+    Do not serve search results cached by other tests
+    :param settings:
+    :return:
+    """
+    settings.SEARCH_RESULT_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    """
+    Do not serve API responses cached by other tests
+    :param settings:
+    :return:
+    """
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    yield
+    # tags are bumped on commit, which tests in a transaction never reach
+    cache.clear()
+
+
 @pytest.fixture
 def create_admin_user(django_user_model):
     """
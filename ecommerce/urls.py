@@ -1,14 +1,33 @@
 from django.contrib import admin
 from django.urls import path
 
-from ecommerce.drf.views import CategoryList, ProductByCategory, ProductInventoryByWebId
-from ecommerce.search.views import SearchProductInventory
+from ecommerce.drf.views import (
+    CatalogExport,
+    CategoryList,
+    CategoryTree,
+    ProductByCategory,
+    ProductInventoryByWebId,
+    ProductInventoryList,
+    ProductList,
+)
+from ecommerce.search.views import (
+    SearchCacheStats,
+    SearchProductInventory,
+    SuggestProductInventory,
+)
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/inventory/category/all", CategoryList.as_view()),
+    path("api/inventory/category/tree/", CategoryTree.as_view()),
+    path("api/inventory/category/tree/<slug:slug>/", CategoryTree.as_view()),
+    path("api/inventory/products/", ProductList.as_view()),
     path("api/inventory/products/category/<str:query>/", ProductByCategory.as_view()),
+    path("api/inventory/", ProductInventoryList.as_view()),
     path("api/inventory/<int:query>/", ProductInventoryByWebId.as_view()),
+    path("api/inventory/export/<str:export_format>/", CatalogExport.as_view()),
     path("api/search/<str:query>/", SearchProductInventory.as_view()),
+    path("api/search-stats/", SearchCacheStats.as_view()),
+    path("api/suggest/<str:prefix>/", SuggestProductInventory.as_view()),
 ]